@@ -1,9 +1,10 @@
 import os
 import re
-import json
+import html
 import asyncio
 import logging
 import hashlib
+import functools
 from pathlib import Path
 from datetime import datetime
 from zoneinfo import ZoneInfo
@@ -11,14 +12,19 @@ from io import BytesIO
 from urllib.parse import quote
 
 import feedparser
-from bs4 import BeautifulSoup
+import orjson
+from lxml import etree
+from selectolax.lexbor import LexborHTMLParser
 
 # Telegram
 import telegram
 
 # Pillow + HTTP
+import PIL
 from PIL import Image, ImageOps
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # ====================
 # CONFIG
@@ -52,9 +58,15 @@ DATA_BASE    = Path("data")            # data/YYYY/MM/DD-MM.json
 GLOBAL_INDEX = Path("global_index")    # index_1.json, index_2.json, pagination.json, stats.json
 IMAGES_DIR   = Path("images")          # images/YYYY/MM/*.webp
 
+# Conditional GET state per feed url: {"etag": ..., "modified": ...}
+FEED_CACHE_FILE = GLOBAL_INDEX / "feed_cache.json"
+
 # Global Index settings
 GLOBAL_PAGE_SIZE = 500  # rotate after this many items per index file
 
+# pagination.json / stats.json kept in memory for the run, written by gi_flush()
+GI_CACHE = {"pag": None, "stats": None, "dirty": False}
+
 # Logo overlay settings
 LOGO_PATH = "logo.png"
 LOGO_MIN_WIDTH_RATIO = 0.10  # 10% for small images
@@ -68,12 +80,34 @@ JPEG_QUALITY     = 85
 WEBP_QUALITY     = 85
 HTTP_TIMEOUT     = 25
 
+# JSON output (compact by default; True -> indent=2, human-readable but ~2x bytes)
+PRETTY_JSON = False
+
 # Telegram caption safety
 TG_CAPTION_DESC_LIMIT = 350  # keep it short so link fits
+TG_SEND_TRIES = 3            # attempts per send when Telegram answers 429 RetryAfter
+TG_RETRY_MAX_DELAY = 60      # cap (seconds) on a single back-off wait
+
+# First <img src="..."> in RSS HTML (cheap path before any HTML parse)
+IMG_SRC_RE = re.compile(r'<img\b[^>]*?\ssrc\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+
+# slugify patterns (compiled once, used per article)
+SLUG_WS_RE   = re.compile(r"\s+")
+SLUG_BAD_RE  = re.compile(r"[^a-z0-9\u0600-\u06FF\-]+")  # keep arabic + latin + numbers + dash
+SLUG_DASH_RE = re.compile(r"-{2,}")
 
 # Logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# Shared HTTP session (keep-alive + pooled connections to the image CDNs)
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.headers["User-Agent"] = "anime-news-bot/1.0"
+HTTP_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
 
 # ====================
 # Utils
@@ -93,25 +127,81 @@ def daily_path(dt: datetime) -> Path:
     ensure_dir(out_dir)
     return out_dir / f"{d:02d}-{m:02d}.json"
 
+def dump_json(data) -> bytes:
+    opts = orjson.OPT_NON_STR_KEYS
+    if PRETTY_JSON:
+        opts |= orjson.OPT_INDENT_2
+    return orjson.dumps(data, option=opts)
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """Write to a temp file next to path, then os.replace (atomic on POSIX)."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+def save_json(path: Path, data):
+    ensure_dir(path.parent)
+    payload = dump_json(data)
+    if path.exists() and path.stat().st_size == len(payload) and path.read_bytes() == payload:
+        return  # unchanged: no write, no mtime bump
+    atomic_write_bytes(path, payload)
+
 def load_json_list(path: Path) -> list:
     if not path.exists():
         return []
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return data if isinstance(data, list) else []
+        data = orjson.loads(path.read_bytes())
+        return data if isinstance(data, list) else []
     except Exception as e:
         logging.error(f"Failed reading {path}: {e}")
         return []
 
 def save_json_list(path: Path, data: list):
     try:
-        ensure_dir(path.parent)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        save_json(path, data)
     except Exception as e:
         logging.error(f"Failed writing {path}: {e}")
 
+def append_json_list(path: Path, records: list):
+    """
+    Append records to a JSON array file in place: the closing "]" is
+    overwritten with ",<records>]", so existing items are neither parsed
+    nor re-serialized. Falls back to load + extend + save when the file
+    does not end like a JSON array; a file that does not parse either is
+    left untouched rather than replaced by the new records alone.
+    """
+    if not records:
+        return
+    if not path.exists() or path.stat().st_size == 0:
+        save_json_list(path, records)
+        return
+    try:
+        inner = dump_json(records)[1:-1]  # drop the outer [ ]
+        with open(path, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            tail_start = max(0, size - 64)
+            f.seek(tail_start)
+            tail = f.read().rstrip()
+            if tail.endswith(b"]"):
+                is_empty = tail[:-1].rstrip().endswith(b"[")
+                f.seek(tail_start + len(tail) - 1)
+                f.write((b"" if is_empty else b",") + inner + b"]")
+                f.truncate()
+                return
+    except Exception as e:
+        logging.error(f"In-place append failed for {path}: {e}")
+
+    try:
+        items = orjson.loads(path.read_bytes())
+    except Exception as e:
+        logging.error(f"Not appending to unreadable {path}: {e}")
+        return
+    if not isinstance(items, list):
+        logging.error(f"Not appending to {path}: not a JSON list")
+        return
+    items.extend(records)
+    save_json_list(path, items)
+
 def read_text_file(path: Path) -> str | None:
     try:
         if not path.exists():
@@ -122,34 +212,38 @@ def read_text_file(path: Path) -> str | None:
         return None
 
 def write_text_file(path: Path, value: str):
+    """Latest-only state: one O(1) write of a single line, swapped in atomically."""
     try:
-        path.write_text((value or "").strip() + "\n", encoding="utf-8")
+        atomic_write_bytes(path, ((value or "").strip() + "\n").encode("utf-8"))
     except Exception as e:
         logging.error(f"Failed writing {path}: {e}")
 
 def slugify(text: str, max_len: int = 60) -> str:
     text = (text or "").strip().lower()
-    text = re.sub(r"\s+", "-", text)
-    # keep arabic + latin + numbers + dash
-    text = re.sub(r"[^a-z0-9\u0600-\u06FF\-]+", "", text)
-    text = re.sub(r"-{2,}", "-", text).strip("-")
+    text = SLUG_WS_RE.sub("-", text)
+    text = SLUG_BAD_RE.sub("", text)
+    text = SLUG_DASH_RE.sub("-", text).strip("-")
     return text[:max_len] if text else "image"
 
-def stable_article_id(title: str, original_url: str) -> str:
+def stable_article_id(title: str, original_url: str, legacy: bool = False) -> str:
     """
     Stable ID based on title + ORIGINAL image url.
     Same news => same id.
+    12 hex chars of blake2b; legacy=True gives the sha1[:12] id that
+    records and state files written before the switch still carry.
     """
-    key = f"{(title or '').strip()}|{(original_url or '').strip()}"
-    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+    key = f"{(title or '').strip()}|{(original_url or '').strip()}".encode("utf-8")
+    if legacy:
+        return hashlib.sha1(key).hexdigest()[:12]
+    return hashlib.blake2b(key, digest_size=6).hexdigest()
 
-def stable_image_filename(title: str, original_url: str) -> str:
+def stable_image_filename(title: str, original_url: str, legacy: bool = False) -> str:
     """
     Stable filename based ONLY on hash(title + original_url).
     No datetime => same item => same filename forever.
     """
     base = slugify(title)
-    h = stable_article_id(title, original_url)  # reuse same hash prefix
+    h = stable_article_id(title, original_url, legacy=legacy)  # reuse same hash prefix
     return f"{base}-{h}.webp"
 
 def build_raw_github_url(rel_path: str) -> str:
@@ -161,9 +255,151 @@ def build_article_url(day_path: str, idx: int) -> str:
     return f"{SITE_BASE_URL}/{ARTICLE_PAGE}?path={encoded}"
 
 
+# ====================
+# RSS fetch (ETag / Last-Modified)
+# ====================
+def load_feed_cache() -> dict:
+    if not FEED_CACHE_FILE.exists():
+        return {}
+    try:
+        data = orjson.loads(FEED_CACHE_FILE.read_bytes())
+        return data if isinstance(data, dict) else {}
+    except Exception as e:
+        logging.error(f"Failed reading {FEED_CACHE_FILE}: {e}")
+        return {}
+
+def save_feed_cache(cache: dict):
+    try:
+        save_json(FEED_CACHE_FILE, cache)
+    except Exception as e:
+        logging.error(f"Failed writing {FEED_CACHE_FILE}: {e}")
+
+def first_entry_only(xml_bytes: bytes) -> bytes:
+    """
+    Only entries[0] is ever used, so cut the document right after the first
+    </item> (RSS) or </entry> (Atom) and close it again; feedparser then
+    builds one entry instead of the whole feed.
+    """
+    for end_tag, closing in ((b"</item>", b"</channel></rss>"), (b"</entry>", b"</feed>")):
+        pos = xml_bytes.find(end_tag)
+        if pos != -1:
+            return xml_bytes[:pos + len(end_tag)] + closing
+    return xml_bytes
+
+# Namespaces of the few elements read from the first entry
+FEED_NS = {
+    "atom": "http://www.w3.org/2005/Atom",
+    "media": "http://search.yahoo.com/mrss/",
+    "content": "http://purl.org/rss/1.0/modules/content/",
+    "yt": "http://www.youtube.com/xml/schemas/2015",
+}
+ENTRY_TAGS = ("item", f"{{{FEED_NS['atom']}}}entry")
+
+def entry_from_element(el) -> feedparser.FeedParserDict:
+    """
+    The fields the extract_* helpers read, shaped like a feedparser entry:
+    title, link, description, content[0].value, media_thumbnail[0]["url"],
+    tags[].term and (YouTube) yt_videoid.
+    """
+    atom = el.tag != "item"
+    p = "atom:" if atom else ""
+    entry = feedparser.FeedParserDict(
+        title=(el.findtext(f"{p}title", "", FEED_NS) or "").strip(),
+    )
+
+    if atom:
+        link = el.find("atom:link[@rel='alternate']", FEED_NS)
+        if link is None:
+            link = el.find("atom:link", FEED_NS)
+        entry["link"] = link.get("href", "") if link is not None else ""
+        description = el.findtext("atom:summary", None, FEED_NS) or el.findtext(".//media:description", None, FEED_NS)
+        content = el.findtext("atom:content", None, FEED_NS)
+        video_id = el.findtext("yt:videoId", None, FEED_NS)
+        if video_id:
+            entry["yt_videoid"] = video_id.strip()
+        terms = [c.get("term") for c in el.iterfind("atom:category", FEED_NS)]
+    else:
+        entry["link"] = (el.findtext("link", "") or "").strip()
+        description = el.findtext("description")
+        content = el.findtext("content:encoded", None, FEED_NS)
+        terms = [c.text for c in el.iterfind("category")]
+
+    if description:
+        entry["description"] = entry["summary"] = description
+    if content:
+        entry["content"] = [feedparser.FeedParserDict(value=content)]
+    thumbs = [t.get("url") for t in el.iterfind(".//media:thumbnail", FEED_NS) if t.get("url")]
+    if thumbs:
+        entry["media_thumbnail"] = [{"url": u} for u in thumbs]
+    tags = [feedparser.FeedParserDict(term=t.strip()) for t in terms if t and t.strip()]
+    if tags:
+        entry["tags"] = tags
+    return entry
+
+def parse_first_entry(xml_bytes: bytes) -> list:
+    """
+    [first entry] of an RSS or Atom feed, or [] if it has none.
+    iterparse stops at the first closed <item>/<entry>, so the rest of the
+    document is never built. Raises etree.XMLSyntaxError on broken XML.
+    """
+    for _, el in etree.iterparse(BytesIO(xml_bytes), events=("end",), tag=ENTRY_TAGS,
+                                 resolve_entities=False, no_network=True):
+        return [entry_from_element(el)]
+    return []
+
+def parse_feed(url: str, cache: dict):
+    """
+    Fetch the feed over the pooled HTTP_SESSION (instead of feedparser's
+    own urllib fetch) with If-None-Match / If-Modified-Since from the cache,
+    then read only the first entry with lxml (feedparser as fallback for
+    malformed XML). An unchanged feed comes back as HTTP 304 and is not
+    parsed at all.
+    """
+    prev = cache.get(url) or {}
+    headers = {}
+    if prev.get("etag"):
+        headers["If-None-Match"] = prev["etag"]
+    if prev.get("modified"):
+        headers["If-Modified-Since"] = prev["modified"]
+
+    resp = HTTP_SESSION.get(url, headers=headers, timeout=HTTP_TIMEOUT)
+    if resp.status_code == 304:
+        return feedparser.FeedParserDict(status=304, entries=[])
+    resp.raise_for_status()
+
+    try:
+        feed = feedparser.FeedParserDict(entries=parse_first_entry(resp.content))
+    except etree.XMLSyntaxError as e:
+        logging.warning(f"lxml could not parse {url} ({e}); falling back to feedparser")
+        feed = feedparser.parse(first_entry_only(resp.content), response_headers=dict(resp.headers))
+    feed["status"] = resp.status_code
+    feed["etag"] = resp.headers.get("ETag")
+    feed["modified"] = resp.headers.get("Last-Modified")
+    return feed
+
+def feed_not_modified(feed) -> bool:
+    return getattr(feed, "status", None) == 304
+
+def remember_feed(cache: dict, url: str, feed):
+    """Store the validators of a feed once it has been fully processed."""
+    etag = feed.get("etag")
+    modified = feed.get("modified")
+    if etag or modified:
+        cache[url] = {"etag": etag, "modified": modified}
+
+
 # ====================
 # RSS extraction helpers
 # ====================
+def html_to_text(raw: str) -> str:
+    """Plain text of an HTML fragment, whitespace collapsed (lexbor, C parser)."""
+    if "<" not in raw and "&" not in raw:
+        # no tags or entities: nothing for a parser to do
+        return " ".join(raw.split())
+    tree = LexborHTMLParser(raw)
+    tree.strip_tags(["script", "style"])  # get_text never returned embed JS/CSS
+    return " ".join(tree.text(separator=" ").split())
+
 def extract_full_text(entry) -> str:
     """
     Full text without HTML:
@@ -174,13 +410,13 @@ def extract_full_text(entry) -> str:
         if hasattr(entry, "content") and entry.content and isinstance(entry.content, list):
             raw = entry.content[0].get("value") or ""
             if raw:
-                return BeautifulSoup(raw, "html.parser").get_text(separator=" ", strip=True)
+                return html_to_text(raw)
     except Exception:
         pass
 
     raw = getattr(entry, "description", "") or ""
     if raw:
-        return BeautifulSoup(raw, "html.parser").get_text(separator=" ", strip=True)
+        return html_to_text(raw)
 
     return ""
 
@@ -188,7 +424,7 @@ def extract_image(entry) -> str | None:
     # 1) media:thumbnail
     if hasattr(entry, "media_thumbnail") and entry.media_thumbnail:
         try:
-            return entry.media_thumbnail[0].get("url") or entry.media_thumbnail[0]["url"]
+            return entry.media_thumbnail[0]["url"]
         except Exception:
             pass
 
@@ -204,10 +440,14 @@ def extract_image(entry) -> str | None:
         raw = getattr(entry, "description", "") or ""
 
     if raw:
-        soup = BeautifulSoup(raw, "html.parser")
-        img = soup.find("img")
-        if img and img.has_attr("src"):
-            return img["src"]
+        m = IMG_SRC_RE.search(raw)
+        if m:
+            return html.unescape(m.group(1))
+        # unusual markup (unquoted src, etc.): let the parser decide
+        if "<img" in raw.lower():
+            img = LexborHTMLParser(raw).css_first("img")
+            if img is not None and img.attributes.get("src"):
+                return img.attributes["src"]
 
     return None
 
@@ -221,10 +461,11 @@ def extract_categories(entry) -> list:
                 cats.append(str(term))
     return cats
 
-def build_daily_record(entry, source_type="crunchyroll") -> dict:
+def build_daily_record(entry, source_type="crunchyroll", image: str | None = None) -> dict:
     """
     Adds: id, created_at, updated_at
     id is stable based on title + ORIGINAL image url
+    image: already-extracted ORIGINAL url, to skip a second extract_image
     """
     if source_type == "youtube":
         title = entry.get("title", "") or ""
@@ -239,7 +480,8 @@ def build_daily_record(entry, source_type="crunchyroll") -> dict:
     else:
         title = getattr(entry, "title", "") or ""
         description_full = extract_full_text(entry)
-        image = extract_image(entry)  # ORIGINAL url (important for stable id)
+        if image is None:
+            image = extract_image(entry)  # ORIGINAL url (important for stable id)
         categories = extract_categories(entry)
 
     now_iso = iso_now()
@@ -255,15 +497,17 @@ def build_daily_record(entry, source_type="crunchyroll") -> dict:
         "updated_at": now_iso
     }
 
-def get_entry_identity(entry, source_type="crunchyroll") -> str:
+def get_entry_identity(entry, source_type="crunchyroll", image: str | None = None,
+                       legacy: bool = False) -> str:
     """Dedup fingerprint: id (title + image)."""
     if source_type == "youtube":
         title = entry.get("title", "") or ""
         image = entry.get("thumbnail_url", "") or ""
     else:
         title = getattr(entry, "title", "") or ""
-        image = extract_image(entry)
-    return stable_article_id(title, image or "")
+        if image is None:
+            image = extract_image(entry)
+    return stable_article_id(title, image or "", legacy=legacy)
 
 
 # ====================
@@ -271,63 +515,80 @@ def get_entry_identity(entry, source_type="crunchyroll") -> str:
 # ====================
 def fetch_image(url: str) -> Image.Image | None:
     try:
-        r = requests.get(url, timeout=HTTP_TIMEOUT)
+        r = HTTP_SESSION.get(url, timeout=HTTP_TIMEOUT)
         r.raise_for_status()
         im = Image.open(BytesIO(r.content))
-        im = ImageOps.exif_transpose(im)
-        return im.convert("RGBA")
+        if im.format == "JPEG":
+            # shrink-on-load: libjpeg decodes at 1/2, 1/4 or 1/8 scale
+            # while staying >= the box downscale_to_fit will cap it to
+            im.draft("RGB", (MAX_IMAGE_WIDTH, MAX_IMAGE_HEIGHT))
+        im.load()
+        # 274 = EXIF Orientation; web images are nearly always 1 (or untagged)
+        if im.getexif().get(274, 1) != 1:
+            im = ImageOps.exif_transpose(im)  # fix orientation
+        # stay in RGB; overlay_logo uses the logo's own alpha as paste mask
+        return im.convert("RGB")
     except Exception as e:
         logging.error(f"fetch_image failed for {url}: {e}")
         return None
 
 def downscale_to_fit(im: Image.Image) -> Image.Image:
-    w, h = im.size
-    scale = min(
-        (MAX_IMAGE_WIDTH / w) if w > 0 else 1,
-        (MAX_IMAGE_HEIGHT / h) if h > 0 else 1,
-        1
-    )
-    if scale < 1:
-        new_w = max(1, int(w * scale))
-        new_h = max(1, int(h * scale))
-        im = im.resize((new_w, new_h), Image.LANCZOS)
+    # in place, keeps aspect ratio, never upscales; box pre-reduce to
+    # ~3x the target before the Lanczos pass
+    im.thumbnail((MAX_IMAGE_WIDTH, MAX_IMAGE_HEIGHT), Image.LANCZOS, reducing_gap=3.0)
     return im
 
-def overlay_logo(im: Image.Image) -> Image.Image:
+def load_logo() -> Image.Image | None:
     if not Path(LOGO_PATH).exists():
         logging.warning(f"Logo file not found: {LOGO_PATH}")
+        return None
+    try:
+        return Image.open(LOGO_PATH).convert("RGBA")
+    except Exception as e:
+        logging.error(f"Failed to open logo: {e}")
+        return None
+
+# Decoded once per process; resized variants are cached by width below
+LOGO_SRC = load_logo()
+
+@functools.lru_cache(maxsize=8)
+def logo_for_width(lw: int) -> tuple[Image.Image, Image.Image]:
+    """Logo resized to width lw, plus its alpha band (used as paste mask)."""
+    ratio = lw / LOGO_SRC.width
+    lh = int(max(1, LOGO_SRC.height * ratio))
+    logo_resized = LOGO_SRC.resize((lw, lh), Image.LANCZOS)
+    return logo_resized, logo_resized.split()[-1]
+
+def overlay_logo(im: Image.Image) -> Image.Image:
+    if LOGO_SRC is None:
         return im
     
     try:
-        logo = Image.open(LOGO_PATH).convert("RGBA")
-        
         # Calculate logo size based on image dimensions
         pw, ph = im.size
         # Use min width ratio for videos (usually 16:9)
         lw_ratio = LOGO_MIN_WIDTH_RATIO if pw < 600 else LOGO_MAX_WIDTH_RATIO
         lw = int(max(1, min(pw - 2 * LOGO_MARGIN, pw * lw_ratio)))
-        ratio = lw / logo.width
-        lh = int(max(1, logo.height * ratio))
         
-        # Resize logo
-        logo_resized = logo.resize((lw, lh), Image.LANCZOS)
+        # Resized logo (cached per width)
+        logo_resized, mask = logo_for_width(lw)
         
         # Position logo in top-right corner
         x = pw - lw - LOGO_MARGIN
         y = LOGO_MARGIN
         
-        # Paste logo with transparency
-        im.paste(logo_resized, (x, y), logo_resized)
+        # Paste logo with transparency (alpha band as mask, base stays RGB)
+        im.paste(logo_resized, (x, y), mask)
         return im
         
     except Exception as e:
         logging.error(f"Failed to overlay logo: {e}")
         return im
 
-def process_image_with_logo(url: str, out_format: str = "JPEG") -> BytesIO | None:
+def prepare_image(url: str) -> Image.Image | None:
     """
-    Process image: fetch, resize, add logo overlay, and save in specified format.
-    Returns BytesIO object with processed image.
+    Fetch, downscale and add the logo overlay.
+    Returns the processed RGB image, ready for encode_image.
     """
     if not url:
         logging.warning("No URL provided for image processing")
@@ -342,23 +603,21 @@ def process_image_with_logo(url: str, out_format: str = "JPEG") -> BytesIO | Non
     base = downscale_to_fit(base)
     
     # Add logo overlay
-    base = overlay_logo(base)
+    return overlay_logo(base)
 
-    # Save to BytesIO
+def encode_image(im: Image.Image, out_format: str = "JPEG") -> BytesIO | None:
+    """Encode a prepared image into a fresh BytesIO in the given format."""
     out = BytesIO()
     fmt = out_format.upper().strip()
 
     try:
+        # im is already RGB (see fetch_image), no conversion pass needed
         if fmt == "WEBP":
-            # Convert to RGB for WebP (WebP doesn't support all modes)
-            if base.mode != 'RGB':
-                base = base.convert('RGB')
-            base.save(out, format="WEBP", quality=WEBP_QUALITY, method=6, optimize=True)
+            im.save(out, format="WEBP", quality=WEBP_QUALITY, method=6, optimize=True)
         else:
-            # Default to JPEG
-            if base.mode != 'RGB':
-                base = base.convert('RGB')
-            base.save(out, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+            # Default to JPEG; single-pass Huffman (no optimize), 4:2:0 chroma,
+            # Telegram recompresses uploads anyway
+            im.save(out, format="JPEG", quality=JPEG_QUALITY, subsampling=2, progressive=False)
         
         out.seek(0)
         return out
@@ -366,17 +625,70 @@ def process_image_with_logo(url: str, out_format: str = "JPEG") -> BytesIO | Non
         logging.error(f"Failed to save processed image: {e}")
         return None
 
+def process_image_with_logo(url: str, out_format: str = "JPEG") -> BytesIO | None:
+    """
+    Process image: fetch, resize, add logo overlay, and save in specified format.
+    Returns BytesIO object with processed image.
+    """
+    prepared = prepare_image(url)
+    if prepared is None:
+        return None
+    return encode_image(prepared, out_format)
+
+async def process_image_with_logo_async(url: str, out_format: str = "JPEG") -> BytesIO | None:
+    """
+    Same as process_image_with_logo, but runs the blocking download + Pillow
+    work in a worker thread so the event loop stays free for Telegram calls.
+    """
+    return await asyncio.to_thread(process_image_with_logo, url, out_format)
+
+async def process_image_jpeg_and_webp(url: str, with_webp: bool = True) -> tuple[BytesIO | None, BytesIO | None]:
+    """
+    Download + downscale + overlay once, then encode the Telegram JPEG and
+    the repo WebP concurrently from the same pixels.
+    Returns (jpeg_bytes, webp_bytes); a failed render comes back as None.
+    with_webp=False skips the WebP encode (already saved in the repo).
+    """
+    prepared = await asyncio.to_thread(prepare_image, url)
+    if prepared is None:
+        return None, None
+    if not with_webp:
+        return await asyncio.to_thread(encode_image, prepared, "JPEG"), None
+
+    # Image.save stores per-call state on the image, so the second encoder
+    # gets its own copy (a memcpy, far cheaper than a second download/resize)
+    results = await asyncio.gather(
+        asyncio.to_thread(encode_image, prepared, "JPEG"),
+        asyncio.to_thread(encode_image, prepared.copy(), "WEBP"),
+        return_exceptions=True,
+    )
+    out = []
+    for fmt, res in zip(("JPEG", "WEBP"), results):
+        if isinstance(res, Exception):
+            logging.error(f"{fmt} render failed for {url}: {res}")
+            res = None
+        out.append(res)
+    return out[0], out[1]
+
+def target_webp_path(title: str, original_url: str, dt: datetime) -> Path:
+    """
+    images/YYYY/MM/<stable filename>.webp for this article image.
+    An image stored before the blake2b switch keeps its sha1 name.
+    """
+    month_dir = IMAGES_DIR / f"{dt.year}" / f"{dt.month:02d}"
+    legacy_path = month_dir / stable_image_filename(title, original_url, legacy=True)
+    if legacy_path.exists():
+        return legacy_path
+    return month_dir / stable_image_filename(title, original_url)
+
 def save_webp_into_repo(title: str, original_url: str, webp_bytes: BytesIO, dt: datetime) -> tuple[str, str, bool]:
     """
     Saves webp into images/YYYY/MM/ using stable filename (hash only).
     Returns: (rel_path, raw_url, created_new_file)
     """
-    y, m = dt.year, dt.month
-    out_dir = IMAGES_DIR / f"{y}" / f"{m:02d}"
-    ensure_dir(out_dir)
+    file_path = target_webp_path(title, original_url, dt)
+    ensure_dir(file_path.parent)
 
-    filename = stable_image_filename(title, original_url)
-    file_path = out_dir / filename
     rel_path = file_path.as_posix()
     raw_url = build_raw_github_url(rel_path)
 
@@ -384,8 +696,7 @@ def save_webp_into_repo(title: str, original_url: str, webp_bytes: BytesIO, dt:
         logging.info(f"Image already exists: {rel_path}")
         return rel_path, raw_url, False
 
-    webp_bytes.seek(0)
-    file_path.write_bytes(webp_bytes.read())
+    atomic_write_bytes(file_path, webp_bytes.getvalue())
     logging.info(f"Saved new image: {rel_path}")
     return rel_path, raw_url, True
 
@@ -393,53 +704,85 @@ def save_webp_into_repo(title: str, original_url: str, webp_bytes: BytesIO, dt:
 # ====================
 # Persist Daily - supports multiple sources
 # ====================
-def save_single_news(entry, source_type="crunchyroll"):
+def prepare_single_news(entry, source_type="crunchyroll", image: str | None = None):
     """
-    Save ONLY 1 entry to today's JSON.
-    Dedup by id within today's file.
-    Return (record_or_none, day_path_str, idx_or_none).
+    Build the record for ONLY 1 entry, unless today's JSON already has it.
+    Dedup by id within today's file; nothing is written here.
+    Return (record_or_none, day_path_str, idx_or_none), idx being the
+    position the record gets once save_single_news appends it.
     """
     today = now_local()
     path = daily_path(today)
     existing = load_json_list(path)
 
-    rec = build_daily_record(entry, source_type)
+    rec = build_daily_record(entry, source_type, image=image)
     new_id = (rec.get("id") or "").strip()
 
+    # records saved before the blake2b switch still carry the sha1 id
+    legacy_id = stable_article_id(rec.get("title") or "", rec.get("image") or "", legacy=True)
+
     existing_ids = {str(x.get("id") or "").strip() for x in existing}
-    if new_id and new_id in existing_ids:
+    if new_id and (new_id in existing_ids or legacy_id in existing_ids):
         logging.info(f"Duplicate detected: {new_id} already exists")
         return None, str(path), None
 
-    existing.append(rec)
-    save_json_list(path, existing)
-    idx = len(existing) - 1
-    return rec, str(path), idx
+    return rec, str(path), len(existing)
+
+def save_single_news(rec: dict, day_path_str: str):
+    """
+    Append the (final) record to today's JSON in place.
+    Called once per record, after its image has been resolved, so the
+    day file is never re-read and rewritten to patch it.
+    """
+    append_json_list(Path(day_path_str), [rec])
 
 
 # ====================
 # Manifests (month/year)
 # ====================
+def load_manifest(path: Path, key: str) -> dict | None:
+    """Existing manifest if it parses and has a dict under key, else None."""
+    try:
+        manifest = orjson.loads(path.read_bytes())
+    except Exception:
+        return None
+    if not isinstance(manifest, dict) or not isinstance(manifest.get(key), dict):
+        return None
+    return manifest
+
 def update_month_manifest(dt: datetime):
     y, m = dt.year, dt.month
     month_dir = DATA_BASE / f"{y}" / f"{m:02d}"
     ensure_dir(month_dir)
     manifest_path = month_dir / "month_manifest.json"
 
-    days = {}
-    for p in sorted(month_dir.glob("*.json")):
-        if p.name == "month_manifest.json":
-            continue
-        day_key = p.stem  # "DD-MM"
-        days[day_key.split("-")[0]] = str(p.as_posix())
+    # only today's entry can change: update it in the existing manifest
+    day_file = month_dir / f"{dt.day:02d}-{m:02d}.json"
+    manifest = load_manifest(manifest_path, "days")
+    if manifest is not None:
+        days = manifest["days"]
+        if day_file.exists():
+            days[f"{dt.day:02d}"] = day_file.as_posix()
+            days = dict(sorted(days.items(), reverse=True))
+    else:
+        # missing/corrupt manifest: rebuild from the directory, newest first
+        # scandir: DirEntry carries the file type, no stat() per file
+        with os.scandir(month_dir) as it:
+            names = sorted((e.name for e in it
+                            if e.is_file() and e.name.endswith(".json") and e.name != "month_manifest.json"),
+                           reverse=True)
+
+        month_prefix = month_dir.as_posix()  # once, not per file
+        days = {}
+        for name in names:
+            days.setdefault(name[:2], f"{month_prefix}/{name}")  # "DD-MM.json" -> "DD"
 
     manifest = {
         "year": str(y),
         "month": f"{m:02d}",
-        "days": dict(sorted(days.items(), key=lambda kv: kv[0], reverse=True))
+        "days": days
     }
-    with open(manifest_path, "w", encoding="utf-8") as f:
-        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    save_json(manifest_path, manifest)
 
 def update_year_manifest(dt: datetime):
     y = dt.year
@@ -447,17 +790,28 @@ def update_year_manifest(dt: datetime):
     ensure_dir(year_dir)
     manifest_path = year_dir / "year_manifest.json"
 
-    months = {}
-    for p in sorted(year_dir.glob("[0-1][0-9]")):
-        m = p.name
-        months[m] = f"{(p / 'month_manifest.json').as_posix()}"
+    month_dir = year_dir / f"{dt.month:02d}"
+    manifest = load_manifest(manifest_path, "months")
+    if manifest is not None:
+        months = manifest["months"]
+        if month_dir.is_dir():
+            months[f"{dt.month:02d}"] = f"{(month_dir / 'month_manifest.json').as_posix()}"
+            months = dict(sorted(months.items(), reverse=True))
+    else:
+        # month dirs "01".."12" (same match as the old "[0-1][0-9]" glob), newest first
+        with os.scandir(year_dir) as it:
+            names = sorted((e.name for e in it
+                            if e.is_dir() and len(e.name) == 2 and e.name[0] in "01" and e.name[1].isdigit()),
+                           reverse=True)
+
+        year_prefix = year_dir.as_posix()
+        months = {m: f"{year_prefix}/{m}/month_manifest.json" for m in names}
 
     manifest = {
         "year": str(y),
-        "months": dict(sorted(months.items(), key=lambda kv: kv[0], reverse=True))
+        "months": months
     }
-    with open(manifest_path, "w", encoding="utf-8") as f:
-        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    save_json(manifest_path, manifest)
 
 
 # ====================
@@ -470,29 +824,40 @@ def gi_paths():
     return pag_path, stats_path
 
 def gi_load_pagination():
+    # read pagination.json once per run; later calls reuse the cached dict
+    if GI_CACHE["pag"] is not None:
+        return GI_CACHE["pag"]
     pag_path, _ = gi_paths()
-    if not pag_path.exists():
-        return {"total_articles": 0, "files": []}
-    try:
-        with open(pag_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {"total_articles": 0, "files": []}
+    pag = {"total_articles": 0, "files": []}
+    if pag_path.exists():
+        try:
+            pag = orjson.loads(pag_path.read_bytes())
+        except Exception:
+            pass
+    GI_CACHE["pag"] = pag
+    return pag
 
 def gi_save_pagination(pag: dict):
-    pag_path, _ = gi_paths()
-    with open(pag_path, "w", encoding="utf-8") as f:
-        json.dump(pag, f, ensure_ascii=False, indent=2)
+    GI_CACHE["pag"] = pag
+    GI_CACHE["dirty"] = True
 
 def gi_save_stats(total_articles: int, added_today: int):
-    _, stats_path = gi_paths()
-    stats = {
+    GI_CACHE["stats"] = {
         "total_articles": total_articles,
         "added_today": added_today,
         "last_update": iso_now()
     }
-    with open(stats_path, "w", encoding="utf-8") as f:
-        json.dump(stats, f, ensure_ascii=False, indent=2)
+    GI_CACHE["dirty"] = True
+
+def gi_flush():
+    """Write pagination.json + stats.json once, if anything changed this run."""
+    if not GI_CACHE["dirty"]:
+        return
+    pag_path, stats_path = gi_paths()
+    save_json(pag_path, GI_CACHE["pag"])
+    if GI_CACHE["stats"] is not None:
+        save_json(stats_path, GI_CACHE["stats"])
+    GI_CACHE["dirty"] = False
 
 def convert_full_to_slim(records: list, source_path: str = None) -> list:
     """
@@ -520,24 +885,33 @@ def gi_append_records(new_records: list):
     pag = gi_load_pagination()
 
     if not pag["files"]:
-        first = GLOBAL_INDEX / "index_1.json"
-        save_json_list(first, [])
         pag["files"].append("index_1.json")
+        pag["current_len"] = 0
 
     current_filename = pag["files"][-1]
     current_file = GLOBAL_INDEX / current_filename
-    items = load_json_list(current_file)
-
-    if len(items) >= GLOBAL_PAGE_SIZE:
-        next_idx = len(pag["files"]) + 1
-        current_filename = f"index_{next_idx}.json"
-        current_file = GLOBAL_INDEX / current_filename
-        save_json_list(current_file, [])
-        pag["files"].append(current_filename)
-        items = []
 
-    items.extend(new_records)
-    save_json_list(current_file, items)
+    # items in the last page are tracked in pagination.json, so the page
+    # itself is only read once for files written before "current_len" existed
+    current_len = pag.get("current_len")
+    if current_len is None:
+        current_len = len(load_json_list(current_file))
+
+    # split the batch over the current page and as many new pages as it
+    # needs; every touched index_N.json is written exactly once
+    pos = 0
+    while pos < len(new_records):
+        if current_len >= GLOBAL_PAGE_SIZE:
+            next_idx = len(pag["files"]) + 1
+            current_filename = f"index_{next_idx}.json"
+            current_file = GLOBAL_INDEX / current_filename
+            pag["files"].append(current_filename)
+            current_len = 0
+        chunk = new_records[pos:pos + GLOBAL_PAGE_SIZE - current_len]
+        append_json_list(current_file, chunk)
+        current_len += len(chunk)
+        pos += len(chunk)
+    pag["current_len"] = current_len
 
     total = (pag.get("total_articles") or 0) + len(new_records)
     pag["total_articles"] = total
@@ -545,6 +919,38 @@ def gi_append_records(new_records: list):
     gi_save_pagination(pag)
     gi_save_stats(total_articles=total, added_today=len(new_records))
 
+def index_new_record(rec: dict, day_path_str: str):
+    """Month/year manifests + global index for a record just saved to today's JSON."""
+    today = now_local()
+    update_month_manifest(today)
+    update_year_manifest(today)
+
+    slim = convert_full_to_slim([rec], day_path_str)
+    gi_append_records(slim)
+
+
+# ====================
+# Telegram send (429 RetryAfter back-off)
+# ====================
+async def send_with_retry(send, **kwargs):
+    """
+    await send(**kwargs) (a bot.send_* method). On 429 RetryAfter wait what
+    Telegram asks for (at least 1s, 2s, 4s... capped at TG_RETRY_MAX_DELAY)
+    and try again, up to TG_SEND_TRIES attempts; then the error propagates.
+    """
+    photo = kwargs.get("photo")
+    for attempt in range(1, TG_SEND_TRIES + 1):
+        if hasattr(photo, "seek"):
+            photo.seek(0)  # a retried upload must re-read the buffer from the start
+        try:
+            return await send(**kwargs)
+        except telegram.error.RetryAfter as e:
+            if attempt == TG_SEND_TRIES:
+                raise
+            delay = min(max(float(e.retry_after), 2 ** (attempt - 1)), TG_RETRY_MAX_DELAY)
+            logging.warning(f"Telegram flood control, retry {attempt}/{TG_SEND_TRIES - 1} in {delay:.0f}s")
+            await asyncio.sleep(delay)
+
 
 # ====================
 # YouTube Integration with Logo
@@ -553,7 +959,7 @@ def get_youtube_video_data(video_id: str) -> dict | None:
     """Fetch video data using oEmbed API"""
     try:
         oembed_url = f"https://www.youtube.com/oembed?url=https://www.youtube.com/watch?v={video_id}&format=json"
-        response = requests.get(oembed_url, timeout=HTTP_TIMEOUT)
+        response = HTTP_SESSION.get(oembed_url, timeout=HTTP_TIMEOUT)
         response.raise_for_status()
         data = response.json()
         
@@ -570,7 +976,7 @@ def get_youtube_video_data(video_id: str) -> dict | None:
         thumbnail_url = thumbnails["maxresdefault"]
         # Check if maxresdefault exists (test with HEAD request)
         try:
-            head_response = requests.head(thumbnail_url, timeout=5)
+            head_response = HTTP_SESSION.head(thumbnail_url, timeout=5)
             if head_response.status_code != 200:
                 thumbnail_url = thumbnails["hqdefault"]
         except:
@@ -596,8 +1002,8 @@ async def process_youtube_video(bot: telegram.Bot, video_id: str):
         logging.error(f"Could not fetch data for video {video_id}")
         return False
     
-    # Save as article
-    rec, day_path_str, idx = save_single_news(video_data, source_type="youtube")
+    # Build article (saved below, once the image is known)
+    rec, day_path_str, idx = prepare_single_news(video_data, source_type="youtube")
     
     if rec is not None:
         article_url = build_article_url(day_path_str, idx if idx is not None else 0)
@@ -607,9 +1013,18 @@ async def process_youtube_video(bot: telegram.Bot, video_id: str):
         webp_url = None
         
         if video_data['thumbnail_url']:
-            # Create WebP with logo for the article
-            webp = process_image_with_logo(video_data['thumbnail_url'], out_format="WEBP")
-            if webp:
+            # WebP already in the repo (rerun): only the Telegram JPEG is needed
+            target = target_webp_path(rec.get("title") or "", video_data['thumbnail_url'], now_local())
+            have_webp = target.exists()
+
+            # JPEG (Telegram) + WebP (article) with logo, rendered in parallel
+            processed_image, webp = await process_image_jpeg_and_webp(
+                video_data['thumbnail_url'], with_webp=not have_webp)
+            if have_webp:
+                webp_url = rec["image"] = build_raw_github_url(target.as_posix())
+                rec["updated_at"] = iso_now()
+                logging.info(f"WebP with logo exists: {target.as_posix()}")
+            elif webp:
                 rel_path, raw_url, created = save_webp_into_repo(
                     title=rec.get("title") or "",
                     original_url=video_data['thumbnail_url'],
@@ -620,16 +1035,9 @@ async def process_youtube_video(bot: telegram.Bot, video_id: str):
                 webp_url = raw_url
                 rec["updated_at"] = iso_now()
                 logging.info(f"WebP with logo {'created' if created else 'exists'}: {rel_path}")
-                
-                # Also create JPEG with logo for Telegram (better compatibility)
-                processed_image = process_image_with_logo(video_data['thumbnail_url'], out_format="JPEG")
         
-        # Update today's JSON with the new image URL
-        day_path = Path(day_path_str)
-        day_records = load_json_list(day_path)
-        if day_records and idx is not None and 0 <= idx < len(day_records):
-            day_records[idx] = rec
-            save_json_list(day_path, day_records)
+        # Save to today's JSON with the final image URL
+        save_single_news(rec, day_path_str)
         
         # Send to Telegram with logo-overlayed image
         caption = f"🎥 {video_data['title']}\n\n📺 {video_data['description']}\n\n🔗 {article_url}"
@@ -637,7 +1045,8 @@ async def process_youtube_video(bot: telegram.Bot, video_id: str):
         try:
             if processed_image:
                 # Send the image with logo overlay
-                await bot.send_photo(
+                await send_with_retry(
+                    bot.send_photo,
                     chat_id=TELEGRAM_CHAT_ID, 
                     photo=processed_image, 
                     caption=caption
@@ -645,7 +1054,8 @@ async def process_youtube_video(bot: telegram.Bot, video_id: str):
                 logging.info(f"Sent YouTube video with logo: {video_data['title']}")
             elif video_data['thumbnail_url']:
                 # Fallback to original thumbnail if processing failed
-                await bot.send_photo(
+                await send_with_retry(
+                    bot.send_photo,
                     chat_id=TELEGRAM_CHAT_ID, 
                     photo=video_data['thumbnail_url'], 
                     caption=caption
@@ -653,30 +1063,27 @@ async def process_youtube_video(bot: telegram.Bot, video_id: str):
                 logging.info(f"Sent YouTube video without logo: {video_data['title']}")
             else:
                 # Send without image
-                await bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=caption)
+                await send_with_retry(bot.send_message, chat_id=TELEGRAM_CHAT_ID, text=caption)
         except Exception as e:
             logging.error(f"Failed to send YouTube video: {e}")
             return False
         
         # Update manifests and global index
-        today = now_local()
-        update_month_manifest(today)
-        update_year_manifest(today)
-        
-        slim = convert_full_to_slim([rec], day_path_str)
-        gi_append_records(slim)
+        index_new_record(rec, day_path_str)
         
         logging.info(f"YouTube video processed successfully: {video_data['title']}")
         return True
     
     return False
 
-async def send_youtube_latest_if_new(bot: telegram.Bot):
-    """Check YouTube RSS for new videos and process them with logo"""
-    feed = feedparser.parse(YOUTUBE_RSS_URL)
+async def send_youtube_latest_if_new(bot: telegram.Bot, feed) -> bool:
+    """
+    Check the (already parsed) YouTube RSS for new videos and process them with logo.
+    Returns False if the latest video still needs another attempt.
+    """
     if not feed.entries:
         logging.warning("No entries in YouTube feed")
-        return
+        return True
     
     entry = feed.entries[0]
     video_id = getattr(entry, "yt_videoid", None)
@@ -688,12 +1095,12 @@ async def send_youtube_latest_if_new(bot: telegram.Bot):
     
     if not video_id:
         logging.error("Could not extract video ID from YouTube entry")
-        return
+        return True
     
     last_vid = read_text_file(YOUTUBE_LAST_ID_FILE)
     if last_vid and video_id == last_vid:
         logging.info("YouTube: latest already sent. Skip.")
-        return
+        return True
     
     # Process the video with logo overlay
     success = await process_youtube_video(bot, video_id)
@@ -701,15 +1108,19 @@ async def send_youtube_latest_if_new(bot: telegram.Bot):
     if success:
         write_text_file(YOUTUBE_LAST_ID_FILE, video_id)
         logging.info(f"YouTube: sent latest video {video_id}")
+    return success
 
 
 # ====================
 # Crunchyroll Senders
 # ====================
-async def send_crunchyroll_one(bot: telegram.Bot, entry, article_url: str | None = None):
-    rec = build_daily_record(entry)
+async def send_crunchyroll_one(bot: telegram.Bot, rec: dict, img_url: str | None = None,
+                               article_url: str | None = None, processed_jpg: BytesIO | None = None):
+    """
+    rec: the daily record (already built, no re-parse of the entry)
+    img_url: ORIGINAL image url, used if the processed JPEG is missing
+    """
     title = rec.get("title") or ""
-    img_url = rec.get("image")
 
     desc = rec.get("description_full") or ""
     short_desc = ""
@@ -723,17 +1134,16 @@ async def send_crunchyroll_one(bot: telegram.Bot, entry, article_url: str | None
         caption += "\n\n🔗 اقرأ المزيد:\n" + article_url
 
     if img_url:
-        processed_jpg = process_image_with_logo(img_url, out_format="JPEG")
         try:
             if processed_jpg:
-                await bot.send_photo(chat_id=TELEGRAM_CHAT_ID, photo=processed_jpg, caption=caption)
+                await send_with_retry(bot.send_photo, chat_id=TELEGRAM_CHAT_ID, photo=processed_jpg, caption=caption)
             else:
-                await bot.send_photo(chat_id=TELEGRAM_CHAT_ID, photo=img_url, caption=caption)
+                await send_with_retry(bot.send_photo, chat_id=TELEGRAM_CHAT_ID, photo=img_url, caption=caption)
             return
         except Exception as e:
             logging.error(f"Failed to send Crunchyroll photo: {e}")
 
-    await bot.send_message(chat_id=TELEGRAM_CHAT_ID, text="📰 خبر جديد\n\n" + caption)
+    await send_with_retry(bot.send_message, chat_id=TELEGRAM_CHAT_ID, text="📰 خبر جديد\n\n" + caption)
 
 
 # ====================
@@ -746,30 +1156,56 @@ async def run():
 
     bot = telegram.Bot(token=TELEGRAM_TOKEN)
 
+    # Pillow-SIMD versions carry a ".postN" suffix
+    simd = "post" in PIL.__version__
+    logging.info(f"Pillow {PIL.__version__} ({'SIMD' if simd else 'stock'} build)")
+
+    # Fetch both feeds at once (network-bound, overlaps the two round-trips)
+    feed_cache = load_feed_cache()
+    news_feed, yt_feed = await asyncio.gather(
+        asyncio.to_thread(parse_feed, CRUNCHYROLL_RSS_URL, feed_cache),
+        asyncio.to_thread(parse_feed, YOUTUBE_RSS_URL, feed_cache),
+        return_exceptions=True,
+    )
+
     # 1) Crunchyroll: ONLY latest, ONLY if new
     try:
-        news_feed = feedparser.parse(CRUNCHYROLL_RSS_URL)
-        if news_feed.entries:
+        if isinstance(news_feed, Exception):
+            raise news_feed
+        if feed_not_modified(news_feed):
+            logging.info("Crun: feed not modified (304). Skip.")
+        elif news_feed.entries:
             latest = news_feed.entries[0]
-            fp = get_entry_identity(latest)
+            latest_img = extract_image(latest)  # once; reused for fp + record
+            fp = get_entry_identity(latest, image=latest_img)
 
             last_fp = read_text_file(CRUNCHYROLL_LAST_FP_FILE)
-            if last_fp and fp == last_fp:
+            if last_fp and last_fp in (fp, get_entry_identity(latest, image=latest_img, legacy=True)):
                 logging.info("Crun: latest already processed/sent. Skip.")
             else:
-                rec, day_path_str, idx = save_single_news(latest)
+                rec, day_path_str, idx = prepare_single_news(latest, image=latest_img)
 
                 if rec is not None:
                     article_url = build_article_url(day_path_str, idx if idx is not None else 0)
 
-                    # Send to Telegram with link
-                    await send_crunchyroll_one(bot, latest, article_url=article_url)
-
-                    # Make WebP, save into same repo, replace rec["image"]
+                    # Render Telegram JPEG + repo WebP together
                     original_img_url = rec.get("image")  # ORIGINAL URL used in id/hash
+                    processed_jpg, webp, target = None, None, None
+                    if original_img_url:
+                        # skip the WebP encode if a rerun already saved it
+                        target = target_webp_path(rec.get("title") or "", original_img_url, now_local())
+                        if not target.exists():
+                            target = None
+                        processed_jpg, webp = await process_image_jpeg_and_webp(
+                            original_img_url, with_webp=target is None)
+
+                    # Save WebP into same repo, replace rec["image"]
                     if original_img_url:
-                        webp = process_image_with_logo(original_img_url, out_format="WEBP")
-                        if webp:
+                        if target is not None:
+                            rec["image"] = build_raw_github_url(target.as_posix())
+                            rec["updated_at"] = iso_now()
+                            logging.info(f"WebP exists: {target.as_posix()}")
+                        elif webp:
                             rel_path, raw_url, created = save_webp_into_repo(
                                 title=rec.get("title") or "",
                                 original_url=original_img_url,
@@ -784,23 +1220,19 @@ async def run():
                     else:
                         logging.info("No image URL in entry; skip webp save.")
 
-                    # Update today's JSON so it contains the new GitHub raw image URL
-                    day_path = Path(day_path_str)
-                    day_records = load_json_list(day_path)
-                    if day_records:
-                        if idx is not None and 0 <= idx < len(day_records):
-                            day_records[idx] = rec
-                        else:
-                            day_records[-1] = rec
-                        save_json_list(day_path, day_records)
-
-                    # manifests + global index
-                    today = now_local()
-                    update_month_manifest(today)
-                    update_year_manifest(today)
+                    # Save to today's JSON, already holding the GitHub raw image URL
+                    save_single_news(rec, day_path_str)
 
-                    slim = convert_full_to_slim([rec], day_path_str)
-                    gi_append_records(slim)
+                    # Send to Telegram with link; manifests + global index are
+                    # written in a worker thread meanwhile, so the upload and
+                    # the disk work overlap instead of running back to back
+                    send_task = asyncio.create_task(send_crunchyroll_one(
+                        bot, rec, img_url=original_img_url,
+                        article_url=article_url, processed_jpg=processed_jpg))
+                    try:
+                        await asyncio.to_thread(index_new_record, rec, day_path_str)
+                    finally:
+                        await send_task
 
                     write_text_file(CRUNCHYROLL_LAST_FP_FILE, fp)
                     logging.info("Crun: sent & saved ONLY latest once.")
@@ -809,15 +1241,30 @@ async def run():
                     logging.info("Crun: latest already in today's data; marked fp to avoid resend.")
         else:
             logging.warning("No entries in Crunchyroll feed.")
+        remember_feed(feed_cache, CRUNCHYROLL_RSS_URL, news_feed)
     except Exception as e:
         logging.error(f"Error processing Crunchyroll: {e}")
 
     # 2) YouTube: ONLY latest, ONLY if new
     try:
-        await send_youtube_latest_if_new(bot)
+        if isinstance(yt_feed, Exception):
+            raise yt_feed
+        if feed_not_modified(yt_feed):
+            logging.info("YouTube: feed not modified (304). Skip.")
+        elif await send_youtube_latest_if_new(bot, yt_feed):
+            remember_feed(feed_cache, YOUTUBE_RSS_URL, yt_feed)
     except Exception as e:
         logging.error(f"Error processing YouTube: {e}")
 
+    gi_flush()
+    save_feed_cache(feed_cache)
+
 
 if __name__ == "__main__":
-    asyncio.run(run())
+    # libuv-backed event loop when available (Linux runners); stock loop otherwise
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    asyncio.run(run(), debug=False)
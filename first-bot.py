@@ -1,13 +1,18 @@
 import os
-import json
+import re
+import html
 import asyncio
 import logging
+import hashlib
+import functools
 from pathlib import Path
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
 import feedparser
-from bs4 import BeautifulSoup
+import orjson
+import lxml.html
+from lxml import etree
 
 # Telegram
 import telegram
@@ -16,6 +21,8 @@ import telegram
 from PIL import Image, ImageOps
 from io import BytesIO
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # ====================
 # CONFIG
@@ -36,6 +43,12 @@ YOUTUBE_RSS_URL = f"https://www.youtube.com/feeds/videos.xml?channel_id={CHANNEL
 CRUNCHYROLL_LAST_FP_FILE = Path("last_crunchyroll_fp.txt")
 YOUTUBE_LAST_ID_FILE     = Path("last_youtube_id.txt")
 
+# Feed validators for conditional GETs (ETag / Last-Modified)
+CRUNCHYROLL_ETAG_FILE     = Path("cr_feed_etag.txt")
+CRUNCHYROLL_MODIFIED_FILE = Path("cr_feed_modified.txt")
+YOUTUBE_ETAG_FILE         = Path("yt_feed_etag.txt")
+YOUTUBE_MODIFIED_FILE     = Path("yt_feed_modified.txt")
+
 # Paths
 DATA_BASE    = Path("data")            # data/YYYY/MM/DD-MM.json
 GLOBAL_INDEX = Path("global_index")    # index_1.json, index_2.json, pagination.json, stats.json
@@ -55,9 +68,24 @@ MAX_IMAGE_HEIGHT = 1280
 JPEG_QUALITY     = 85
 HTTP_TIMEOUT     = 25
 
+# JSON output (compact by default, same as bot.py; True -> indent=2, ~2x bytes)
+PRETTY_JSON = False
+
+# First <img src="..."> in entry HTML (lxml only for odd markup)
+IMG_SRC_RE = re.compile(r'<img\b[^>]*?\ssrc\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+
 # Logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# Shared HTTP session (keep-alive + pooled connections to the image CDNs)
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.headers["User-Agent"] = "anime-news-bot/1.0"
+HTTP_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
 
 # ====================
 # Utils
@@ -78,21 +106,77 @@ def load_json_list(path: Path) -> list:
     if not path.exists():
         return []
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
             return data if isinstance(data, list) else []
     except Exception as e:
         logging.error(f"Failed reading {path}: {e}")
         return []
 
+def dump_json(data) -> bytes:
+    opts = orjson.OPT_NON_STR_KEYS
+    if PRETTY_JSON:
+        opts |= orjson.OPT_INDENT_2
+    return orjson.dumps(data, option=opts)
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """Write to a temp file next to path, then os.replace (atomic on POSIX)."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+def save_json(path: Path, data):
+    """UTF-8 JSON (orjson serializes straight to bytes)."""
+    payload = dump_json(data)
+    if path.exists() and path.stat().st_size == len(payload) and path.read_bytes() == payload:
+        return  # unchanged: no write, no mtime bump
+    atomic_write_bytes(path, payload)
+
 def save_json_list(path: Path, data: list):
     try:
         ensure_dir(path.parent)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        save_json(path, data)
     except Exception as e:
         logging.error(f"Failed writing {path}: {e}")
 
+def append_json_list(path: Path, records: list):
+    """
+    Append records to a JSON array file in place: the closing "]" is
+    overwritten with ",<records>]" so existing items are not re-parsed.
+    Falls back to load + extend + save when the file does not end in "]".
+    """
+    if not records:
+        return
+    if not path.exists() or path.stat().st_size == 0:
+        save_json_list(path, records)
+        return
+    try:
+        inner = dump_json(records)[1:-1]  # drop the outer [ ]
+        with open(path, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            tail_start = max(0, size - 64)
+            f.seek(tail_start)
+            tail = f.read().rstrip()
+            if tail.endswith(b"]"):
+                is_empty = tail[:-1].rstrip().endswith(b"[")
+                f.seek(tail_start + len(tail) - 1)
+                f.write((b"" if is_empty else b",") + inner + b"]")
+                f.truncate()
+                return
+    except Exception as e:
+        logging.error(f"In-place append failed for {path}: {e}")
+
+    try:
+        items = orjson.loads(path.read_bytes())
+    except Exception as e:
+        logging.error(f"Not appending to unreadable {path}: {e}")
+        return
+    if not isinstance(items, list):
+        logging.error(f"Not appending to {path}: not a JSON list")
+        return
+    items.extend(records)
+    save_json_list(path, items)
+
 def read_text_file(path: Path) -> str | None:
     try:
         if not path.exists():
@@ -103,8 +187,9 @@ def read_text_file(path: Path) -> str | None:
         return None
 
 def write_text_file(path: Path, value: str):
+    """Latest-only state: one O(1) write of a single line, swapped in atomically."""
     try:
-        path.write_text((value or "").strip() + "\n", encoding="utf-8")
+        atomic_write_bytes(path, ((value or "").strip() + "\n").encode("utf-8"))
     except Exception as e:
         logging.error(f"Failed writing {path}: {e}")
 
@@ -112,9 +197,9 @@ def write_text_file(path: Path, value: str):
 # ====================
 # RSS extraction helpers
 # ====================
-def extract_full_text(entry) -> str:
+def entry_html(entry) -> str:
     """
-    Full text without HTML:
+    Raw HTML of the entry:
     - prefer content:encoded (entry.content[0].value)
     - fallback to description
     """
@@ -122,39 +207,95 @@ def extract_full_text(entry) -> str:
         if hasattr(entry, "content") and entry.content and isinstance(entry.content, list):
             raw = entry.content[0].get("value") or ""
             if raw:
-                return BeautifulSoup(raw, "html.parser").get_text(separator=" ", strip=True)
+                return raw
     except Exception:
         pass
+    return getattr(entry, "description", "") or ""
 
-    raw = getattr(entry, "description", "") or ""
-    if raw:
-        return BeautifulSoup(raw, "html.parser").get_text(separator=" ", strip=True)
-
-    return ""
-
-def extract_image(entry) -> str | None:
-    # 1) media:thumbnail
+def thumbnail_url(entry) -> str | None:
+    """media:thumbnail url (no HTML parsing)."""
     if hasattr(entry, "media_thumbnail") and entry.media_thumbnail:
         try:
-            return entry.media_thumbnail[0].get("url") or entry.media_thumbnail[0]["url"]
+            return entry.media_thumbnail[0]["url"]
         except Exception:
             pass
-    # 2) from content/description
-    raw = ""
+    return None
+
+def parse_fragment(raw: str):
+    """lxml.html tree of an HTML fragment, or None for an empty document."""
     try:
-        if hasattr(entry, "content") and entry.content and isinstance(entry.content, list):
-            raw = entry.content[0].get("value") or ""
-    except Exception:
-        pass
-    if not raw:
-        raw = getattr(entry, "description", "") or ""
-    if raw:
-        soup = BeautifulSoup(raw, "html.parser")
-        img = soup.find("img")
-        if img and img.has_attr("src"):
-            return img["src"]
+        try:
+            return lxml.html.fromstring(raw)
+        except ValueError:
+            # str with an XML encoding declaration: lxml wants the bytes
+            return lxml.html.fromstring(raw.encode("utf-8"))
+    except etree.ParserError:
+        return None
+
+def html_to_text(raw: str) -> str:
+    """
+    Plain text of an HTML fragment straight from the lxml tree, same output
+    as BeautifulSoup get_text(separator=" ", strip=True).
+    """
+    if "<" not in raw and "&" not in raw:
+        # no tags or entities: nothing for a parser to do
+        return raw.strip()
+    root = parse_fragment(raw)
+    if root is None:
+        return ""
+    etree.strip_elements(root, "script", "style", with_tail=False)
+    return " ".join(s for s in (t.strip() for t in root.itertext()) if s)
+
+def first_img_src(raw: str) -> str | None:
+    m = IMG_SRC_RE.search(raw)
+    if m:
+        return html.unescape(m.group(1))
+    # unusual markup (unquoted src, etc.): let the parser decide
+    if "<img" in raw.lower():
+        root = parse_fragment(raw)
+        img = next(root.iter("img"), None) if root is not None else None
+        if img is not None and img.get("src"):
+            return img.get("src")
     return None
 
+def extract_all(entry) -> tuple[str, str | None]:
+    """
+    Parse the entry HTML once -> (plain text, image url).
+    Image: media:thumbnail first, else first <img src>.
+    Result is cached on the entry so record/identity/dedup share one parse.
+    """
+    cached = entry.__dict__.get("_parsed")
+    if cached is not None:
+        return cached
+
+    # 1) media:thumbnail
+    image = thumbnail_url(entry)
+
+    # 2) text (+ image fallback) from content/description
+    text = ""
+    raw = entry_html(entry)
+    if raw:
+        text = html_to_text(raw)
+        if image is None:
+            image = first_img_src(raw)
+
+    entry.__dict__["_parsed"] = (text, image)
+    return text, image
+
+def extract_full_text(entry) -> str:
+    """Full text without HTML (content:encoded, else description)."""
+    return extract_all(entry)[0]
+
+def extract_image(entry) -> str | None:
+    cached = entry.__dict__.get("_parsed")
+    if cached is not None:
+        return cached[1]
+    image = thumbnail_url(entry)
+    if image is None:
+        raw = entry_html(entry)
+        image = first_img_src(raw) if raw else None
+    return image
+
 def extract_categories(entry) -> list:
     cats = []
     tags = getattr(entry, "tags", None)
@@ -174,8 +315,7 @@ def build_daily_record(entry) -> dict:
     - categories
     """
     title = getattr(entry, "title", "") or ""
-    description_full = extract_full_text(entry)
-    image = extract_image(entry)
+    description_full, image = extract_all(entry)
     categories = extract_categories(entry)
     return {
         "title": title,
@@ -185,59 +325,83 @@ def build_daily_record(entry) -> dict:
     }
 
 def get_entry_identity(entry) -> str:
-    """Dedup fingerprint: title + image."""
+    """
+    Dedup fingerprint: title + image.
+    extract_image checks media:thumbnail first, so an already-sent entry is
+    rejected without touching its HTML; only thumbnail-less entries parse it.
+    """
     title = getattr(entry, "title", "") or ""
     image = extract_image(entry)
     return f"{title.strip()}|{(image or '').strip()}"
 
+def fp8(title: str, image: str) -> int:
+    """Compact 64-bit int form of the title|image fingerprint (for in-memory dedup sets)."""
+    key = f"{(title or '').strip()}|{(image or '').strip()}"
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
 
 # ====================
 # Image processing (logo + resize)
 # ====================
 def fetch_image(url: str) -> Image.Image | None:
     try:
-        r = requests.get(url, timeout=HTTP_TIMEOUT)
+        r = HTTP_SESSION.get(url, timeout=HTTP_TIMEOUT)
         r.raise_for_status()
         im = Image.open(BytesIO(r.content))
-        im = ImageOps.exif_transpose(im)  # fix orientation
-        return im.convert("RGBA")
+        if im.format == "JPEG":
+            # shrink-on-load: libjpeg decodes at 1/2, 1/4 or 1/8 scale
+            # while staying >= the box downscale_to_fit will cap it to
+            im.draft("RGB", (MAX_IMAGE_WIDTH, MAX_IMAGE_HEIGHT))
+        im.load()
+        # 274 = EXIF Orientation; web images are nearly always 1 (or untagged)
+        if im.getexif().get(274, 1) != 1:
+            im = ImageOps.exif_transpose(im)  # fix orientation
+        # RGB is enough: overlay_logo pastes with the logo's own alpha as mask
+        return im.convert("RGB")
     except Exception as e:
         logging.error(f"fetch_image failed for {url}: {e}")
         return None
 
 def downscale_to_fit(im: Image.Image) -> Image.Image:
-    w, h = im.size
-    scale = min(
-        (MAX_IMAGE_WIDTH / w) if w > 0 else 1,
-        (MAX_IMAGE_HEIGHT / h) if h > 0 else 1,
-        1
-    )
-    if scale < 1:
-        new_w = max(1, int(w * scale))
-        new_h = max(1, int(h * scale))
-        im = im.resize((new_w, new_h), Image.LANCZOS)
+    # in place, keeps aspect ratio, never upscales; box pre-reduce to
+    # ~3x the target before the Lanczos pass
+    im.thumbnail((MAX_IMAGE_WIDTH, MAX_IMAGE_HEIGHT), Image.LANCZOS, reducing_gap=3.0)
     return im
 
-def overlay_logo(im: Image.Image) -> Image.Image:
-    """Overlay logo top-right with adaptive size."""
+def load_logo() -> Image.Image | None:
     if not Path(LOGO_PATH).exists():
-        return im
+        logging.warning(f"Logo file not found: {LOGO_PATH}")
+        return None
     try:
-        logo = Image.open(LOGO_PATH).convert("RGBA")
+        return Image.open(LOGO_PATH).convert("RGBA")
     except Exception as e:
         logging.error(f"Failed to open logo: {e}")
+        return None
+
+# Decoded once per process; resized variants are cached by width below
+LOGO_SRC = load_logo()
+
+@functools.lru_cache(maxsize=8)
+def logo_for_width(lw: int) -> tuple[Image.Image, Image.Image]:
+    """Logo resized to width lw, plus its alpha band (used as paste mask)."""
+    ratio = lw / LOGO_SRC.width
+    lh = int(max(1, LOGO_SRC.height * ratio))
+    logo_resized = LOGO_SRC.resize((lw, lh), Image.LANCZOS)
+    return logo_resized, logo_resized.split()[-1]
+
+def overlay_logo(im: Image.Image) -> Image.Image:
+    """Overlay logo top-right with adaptive size."""
+    if LOGO_SRC is None:
         return im
 
     pw, _ = im.size
     lw_ratio = LOGO_MIN_WIDTH_RATIO if pw < 600 else LOGO_MAX_WIDTH_RATIO
     lw = int(max(1, min(pw - 2 * LOGO_MARGIN, pw * lw_ratio)))
-    ratio = lw / logo.width
-    lh = int(max(1, logo.height * ratio))
-    logo_resized = logo.resize((lw, lh), Image.LANCZOS)
+    logo_resized, mask = logo_for_width(lw)
 
     x = pw - lw - LOGO_MARGIN
     y = LOGO_MARGIN
-    im.paste(logo_resized, (x, y), logo_resized)
+    im.paste(logo_resized, (x, y), mask)
     return im
 
 def process_image_with_logo(url: str) -> BytesIO | None:
@@ -256,11 +420,47 @@ def process_image_with_logo(url: str) -> BytesIO | None:
     base = overlay_logo(base)
 
     out = BytesIO()
-    base.convert("RGB").save(out, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    base.save(out, format="JPEG", quality=JPEG_QUALITY, optimize=True)
     out.seek(0)
     return out
 
 
+# ====================
+# RSS fetch
+# ====================
+def fetch_feed(url: str, etag_file: Path, modified_file: Path):
+    """
+    Download the feed (with timeout) and hand the bytes to feedparser.
+    Sends the stored ETag / Last-Modified; an unchanged feed comes back as
+    304 with no body, returned as an empty feed with status 304.
+    """
+    headers = {}
+    etag = read_text_file(etag_file)
+    if etag:
+        headers["If-None-Match"] = etag
+    modified = read_text_file(modified_file)
+    if modified:
+        headers["If-Modified-Since"] = modified
+
+    r = HTTP_SESSION.get(url, headers=headers, timeout=HTTP_TIMEOUT)
+    if r.status_code == 304:
+        return feedparser.FeedParserDict(status=304, entries=[])
+    r.raise_for_status()
+
+    feed = feedparser.parse(r.content)
+    feed["status"] = r.status_code
+    feed["etag"] = r.headers.get("ETag")
+    feed["modified"] = r.headers.get("Last-Modified")
+    return feed
+
+def remember_feed(feed, etag_file: Path, modified_file: Path):
+    """Store the validators only once the feed has been handled."""
+    if feed.get("etag"):
+        write_text_file(etag_file, feed["etag"])
+    if feed.get("modified"):
+        write_text_file(modified_file, feed["modified"])
+
+
 # ====================
 # Persist Daily (Crunchyroll) - ONLY ONE
 # ====================
@@ -274,8 +474,10 @@ def save_single_news(entry):
     path = daily_path(today)
     existing = load_json_list(path)
 
-    fp = get_entry_identity(entry)
-    existing_fp = {f"{(x.get('title') or '').strip()}|{(x.get('image') or '').strip()}" for x in existing}
+    title = getattr(entry, "title", "") or ""
+    image = extract_image(entry)
+    fp = fp8(title, image or "")
+    existing_fp = {fp8(x.get("title") or "", x.get("image") or "") for x in existing}
 
     if fp in existing_fp:
         return None, str(path)
@@ -295,20 +497,23 @@ def update_month_manifest(dt: datetime):
     ensure_dir(month_dir)
     manifest_path = month_dir / "month_manifest.json"
 
+    # scandir: DirEntry carries the file type, no stat() per file
+    with os.scandir(month_dir) as it:
+        names = sorted((e.name for e in it
+                        if e.is_file() and e.name.endswith(".json") and e.name != "month_manifest.json"),
+                       reverse=True)
+
+    month_prefix = month_dir.as_posix()  # once, not per file
     days = {}
-    for p in sorted(month_dir.glob("*.json")):
-        if p.name == "month_manifest.json":
-            continue
-        day_key = p.stem  # "DD-MM"
-        days[day_key.split("-")[0]] = str(p.as_posix())
+    for name in names:
+        days.setdefault(name[:2], f"{month_prefix}/{name}")  # "DD-MM.json" -> "DD"
 
     manifest = {
         "year": str(y),
         "month": f"{m:02d}",
-        "days": dict(sorted(days.items(), key=lambda kv: kv[0], reverse=True))
+        "days": days
     }
-    with open(manifest_path, "w", encoding="utf-8") as f:
-        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    save_json(manifest_path, manifest)
 
 def update_year_manifest(dt: datetime):
     y = dt.year
@@ -316,17 +521,20 @@ def update_year_manifest(dt: datetime):
     ensure_dir(year_dir)
     manifest_path = year_dir / "year_manifest.json"
 
-    months = {}
-    for p in sorted(year_dir.glob("[0-1][0-9]")):
-        m = p.name
-        months[m] = f"{(p / 'month_manifest.json').as_posix()}"
+    # month dirs "01".."12" (same match as the old "[0-1][0-9]" glob)
+    with os.scandir(year_dir) as it:
+        names = sorted((e.name for e in it
+                        if e.is_dir() and len(e.name) == 2 and e.name[0] in "01" and e.name[1].isdigit()),
+                       reverse=True)
+
+    year_prefix = year_dir.as_posix()
+    months = {m: f"{year_prefix}/{m}/month_manifest.json" for m in names}
 
     manifest = {
         "year": str(y),
-        "months": dict(sorted(months.items(), key=lambda kv: kv[0], reverse=True))
+        "months": months
     }
-    with open(manifest_path, "w", encoding="utf-8") as f:
-        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    save_json(manifest_path, manifest)
 
 
 # ====================
@@ -343,15 +551,14 @@ def gi_load_pagination():
     if not pag_path.exists():
         return {"total_articles": 0, "files": []}
     try:
-        with open(pag_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(pag_path, "rb") as f:
+            return orjson.loads(f.read())
     except Exception:
         return {"total_articles": 0, "files": []}
 
 def gi_save_pagination(pag: dict):
     pag_path, _ = gi_paths()
-    with open(pag_path, "w", encoding="utf-8") as f:
-        json.dump(pag, f, ensure_ascii=False, indent=2)
+    save_json(pag_path, pag)
 
 def gi_save_stats(total_articles: int, added_today: int):
     _, stats_path = gi_paths()
@@ -360,8 +567,7 @@ def gi_save_stats(total_articles: int, added_today: int):
         "added_today": added_today,
         "last_update": now_local().isoformat()
     }
-    with open(stats_path, "w", encoding="utf-8") as f:
-        json.dump(stats, f, ensure_ascii=False, indent=2)
+    save_json(stats_path, stats)
 
 def convert_full_to_slim(records: list, source_path: str = None) -> list:
     """
@@ -386,24 +592,27 @@ def gi_append_records(new_records: list):
     pag = gi_load_pagination()
 
     if not pag["files"]:
-        first = GLOBAL_INDEX / "index_1.json"
-        save_json_list(first, [])
         pag["files"].append("index_1.json")
+        pag["current_len"] = 0
 
     current_filename = pag["files"][-1]
     current_file = GLOBAL_INDEX / current_filename
-    items = load_json_list(current_file)
 
-    if len(items) >= GLOBAL_PAGE_SIZE:
+    # size of the last page lives in pagination.json; the page itself is
+    # only read for files written before "current_len" existed
+    current_len = pag.get("current_len")
+    if current_len is None:
+        current_len = len(load_json_list(current_file))
+
+    if current_len >= GLOBAL_PAGE_SIZE:
         next_idx = len(pag["files"]) + 1
         current_filename = f"index_{next_idx}.json"
         current_file = GLOBAL_INDEX / current_filename
-        save_json_list(current_file, [])
         pag["files"].append(current_filename)
-        items = []
+        current_len = 0
 
-    items.extend(new_records)
-    save_json_list(current_file, items)
+    append_json_list(current_file, new_records)
+    pag["current_len"] = current_len + len(new_records)
 
     total = (pag.get("total_articles") or 0) + len(new_records)
     pag["total_articles"] = total
@@ -439,15 +648,15 @@ async def send_crunchyroll_one(bot: telegram.Bot, entry):
     await bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=text)
 
 
-async def send_youtube_latest_if_new(bot: telegram.Bot):
+async def send_youtube_latest_if_new(bot: telegram.Bot, feed):
     """
     ONLY latest video:
     - if vid == last saved -> skip
     - else send & write last id
+    Returns False only when sending failed.
     """
-    feed = feedparser.parse(YOUTUBE_RSS_URL)
     if not feed.entries:
-        return
+        return True
 
     entry = feed.entries[0]
     vid = getattr(entry, "yt_videoid", None) or getattr(entry, "id", None) or ""
@@ -457,11 +666,9 @@ async def send_youtube_latest_if_new(bot: telegram.Bot):
     last_vid = read_text_file(YOUTUBE_LAST_ID_FILE)
     if last_vid and vid and vid == last_vid:
         logging.info("YT: latest already sent. Skip.")
-        return
+        return True
 
-    thumb = None
-    if hasattr(entry, "media_thumbnail") and entry.media_thumbnail:
-        thumb = entry.media_thumbnail[0].get("url")
+    thumb = thumbnail_url(entry)
 
     caption = f"🎥 {title}\n{url}"
     try:
@@ -471,10 +678,11 @@ async def send_youtube_latest_if_new(bot: telegram.Bot):
             await bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=caption)
     except Exception as e:
         logging.error(f"Failed to send YouTube: {e}")
-        return
+        return False
 
     write_text_file(YOUTUBE_LAST_ID_FILE, vid)
     logging.info("YT: sent latest & saved id.")
+    return True
 
 
 # ====================
@@ -487,9 +695,19 @@ async def run():
 
     bot = telegram.Bot(token=TELEGRAM_TOKEN)
 
+    # Fetch both feeds at once (blocking downloads run in worker threads)
+    news_feed, yt_feed = await asyncio.gather(
+        asyncio.to_thread(fetch_feed, CRUNCHYROLL_RSS_URL, CRUNCHYROLL_ETAG_FILE, CRUNCHYROLL_MODIFIED_FILE),
+        asyncio.to_thread(fetch_feed, YOUTUBE_RSS_URL, YOUTUBE_ETAG_FILE, YOUTUBE_MODIFIED_FILE),
+        return_exceptions=True,
+    )
+
     # 1) Crunchyroll: ONLY latest, ONLY if new -> send + save + index
-    news_feed = feedparser.parse(CRUNCHYROLL_RSS_URL)
-    if news_feed.entries:
+    if isinstance(news_feed, Exception):
+        logging.error(f"Failed fetching Crunchyroll feed: {news_feed}")
+    elif news_feed.get("status") == 304:
+        logging.info("Crun: feed not modified (304). Skip.")
+    elif news_feed.entries:
         latest = news_feed.entries[0]
         fp = get_entry_identity(latest)
 
@@ -518,8 +736,16 @@ async def run():
     else:
         logging.warning("No entries in Crunchyroll feed.")
 
+    if not isinstance(news_feed, Exception):
+        remember_feed(news_feed, CRUNCHYROLL_ETAG_FILE, CRUNCHYROLL_MODIFIED_FILE)
+
     # 2) YouTube: ONLY latest, ONLY if new
-    await send_youtube_latest_if_new(bot)
+    if isinstance(yt_feed, Exception):
+        logging.error(f"Failed fetching YouTube feed: {yt_feed}")
+    elif yt_feed.get("status") == 304:
+        logging.info("YT: feed not modified (304). Skip.")
+    elif await send_youtube_latest_if_new(bot, yt_feed):
+        remember_feed(yt_feed, YOUTUBE_ETAG_FILE, YOUTUBE_MODIFIED_FILE)
 
 
 if __name__ == "__main__":
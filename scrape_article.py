@@ -2,14 +2,31 @@
 # -*- coding: utf-8 -*-
 import os
 import re
+import sys
 import json
+import hashlib
+import atexit
 import argparse
+import tempfile
+import functools
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
+from html import unescape
 from urllib.parse import urlparse, urljoin
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import etree
+
+# --- Optional orjson (أسرع؛ json القياسي كبديل) ---
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except Exception:
+    ORJSON_AVAILABLE = False
 
 # --- Optional Playwright (for login / dynamic pages) ---
 USE_PLAYWRIGHT_DEFAULT = True
@@ -23,185 +40,456 @@ except Exception:
 TZ = "Africa/Casablanca"
 BASE_SAVE = Path("data/scraped")
 SAVE_HTML_IN_JSON = False   # اجعلها True لو تريد html الخام
+RAW_MODE = False            # --raw: حفظ html الخام + العنوان فقط بدون تحليل الصفحة
 TIMEOUT = 30
+MAX_WORKERS = 8             # عدد الطلبات المتزامنة في وضع --urls-file
+EXTRACT_POOL_MIN = 4        # من هذا العدد من الصفحات يتم التحليل في عمليات متوازية
+BROWSER_STATUS = (403, 429, 503)  # حالات تستحق محاولة المتصفح (حظر / JS wall)
+JS_WALL_SCAN = 65536              # نفحص أول 64KB فقط بحثاً عن صفحة "enable JavaScript"
+# المتصفح يحتاج HTML فقط: روابط الصور/الفيديو تُقرأ من DOM ولا تُحمّل
+BLOCKED_RESOURCES = frozenset(["image", "font", "media", "stylesheet"])
 
 # بيئة تسجيل الدخول (اختياري):
 CR_EMAIL    = os.getenv("CR_EMAIL")       # بريد كرانشي رول
 CR_PASSWORD = os.getenv("CR_PASSWORD")    # كلمة المرور
 CR_COUNTRY  = os.getenv("CR_COUNTRY", "ar-SA")  # قد لا تحتاجها
+# كوكيز الجلسة بعد تسجيل الدخول (خارج المستودع حتى لا تُرفع مع git add -A)
+CR_STORAGE_STATE = os.getenv("CR_STORAGE_STATE", os.path.join(tempfile.gettempdir(), "cr_storage_state.json"))
+
+# حاويات المقال الشائعة: <article> أو أحد هذه الكلاسات
+ARTICLE_CLASSES = frozenset(["content", "post-content", "c-article", "story", "article-body"])
+PARAGRAPH_TAGS = frozenset(["p", "h2", "h3", "li"])
+
+# تجاهل الأيقونات الصغيرة: أبعاد < 64px أو روابط sprite/icon/logo/pixel/tracking
+MIN_IMAGE_SIDE = 64
+# (a whole path segment only: iconic-scene.jpg / logo-reveal-trailer.png / icons-of-anime/ are real images)
+ICON_URL_RE = re.compile(r"(?:^|/)(?:sprites?|icons?|logo|pixel|tracking|1x1)(?:[_-]?\d+)?(?:@\dx)?(?:\.\w+)?(?:[/?#]|$)",
+                         re.IGNORECASE)
+DIM_RE = re.compile(r"\s*(\d+)")
+
+# JSON-LD (NewsArticle ...): title/author/date/images/body already normalized
+LD_JSON_RE = re.compile(r"""<script[^>]*\stype\s*=\s*["']application/ld\+json["'][^>]*>(.*?)</script>""",
+                        re.IGNORECASE | re.DOTALL)
+LD_ARTICLE_TYPES = frozenset(["NewsArticle", "Article", "BlogPosting", "ReportageNewsArticle"])
+
+# Visible text of a node: like bs4's get_text, script/style/template bodies are not text
+NODE_TEXT = etree.XPath(".//text()[not(ancestor::script or ancestor::style or ancestor::template)]",
+                        smart_strings=False)
+# Whole-page text for the fallback, noscript dropped as well
+PAGE_TEXT = etree.XPath("//text()[not(ancestor::script or ancestor::style or ancestor::noscript"
+                        " or ancestor::template)]", smart_strings=False)
+# Plain etree parser: no lxml.html element-class lookup per node while walking
+HTML_PARSER = etree.HTMLParser()
+UTF8_HTML_PARSER = etree.HTMLParser(encoding="utf-8")
+
+# Shared HTTP session (keep-alive + pooled connections, reused across URLs and threads)
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.headers.update({
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120 Safari/537.36",
+    "Accept-Language": "ar-SA,ar;q=0.9,en;q=0.8",
+})
+# Accept-Encoding is left to requests: it advertises "gzip, deflate, br" as soon
+# as the brotli package is installed, and only then can urllib3 decode br
+HTTP_ADAPTER = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    # 429/503 are not retried here: fetch_static hands them to the browser at
+    # once instead of sleeping through an unbounded Retry-After
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 504],
+                      raise_on_status=False, respect_retry_after_header=False),
+)
+HTTP_SESSION.mount("https://", HTTP_ADAPTER)
+HTTP_SESSION.mount("http://", HTTP_ADAPTER)
+atexit.register(HTTP_SESSION.close)
+
+# JS wall / block page signatures, one scan over the raw bytes
+JS_WALL_RE = re.compile(rb"Please enable JavaScript|(?i:access denied)")
+
+# <title> for --raw mode (slug only, no DOM parse)
+TITLE_RE = re.compile(r"<title[^>]*>([^<]{1,300})</title>", re.I)
+
+# slugify patterns (compiled once)
+SLUG_WS_RE  = re.compile(r"\s+")
+SLUG_BAD_RE = re.compile(r"[^0-9A-Za-z\u0600-\u06FF\-\_]+")  # عربي + إنجليزي
 
 # ========= Helpers =========
 def slugify(text: str) -> str:
-    text = text.strip()
-    text = re.sub(r"\s+", "-", text)
-    text = re.sub(r"[^0-9A-Za-z\u0600-\u06FF\-\_]+", "", text)  # عربي + إنجليزي
+    text = SLUG_BAD_RE.sub("", SLUG_WS_RE.sub("-", text.strip()))
     return text[:120] or "article"
 
 def ensure_dir(p: Path):
     p.mkdir(parents=True, exist_ok=True)
 
+# مجلد اليوم يُحسب مرة واحدة لكل تشغيل (دفعة --urls-file نادراً ما تعبر منتصف الليل)
+TODAY_DIR: Path | None = None
+
 def today_paths() -> Path:
-    now = datetime.now()
-    out_dir = BASE_SAVE / f"{now.year}" / f"{now.month:02d}" / f"{now.day:02d}"
-    ensure_dir(out_dir)
-    return out_dir
+    global TODAY_DIR
+    if TODAY_DIR is None:
+        now = datetime.now()
+        TODAY_DIR = BASE_SAVE / f"{now.year}" / f"{now.month:02d}" / f"{now.day:02d}"
+        ensure_dir(TODAY_DIR)
+    return TODAY_DIR
 
 def abs_url(base: str, src: str) -> str:
     if not src:
         return ""
+    if src.startswith(("https://", "http://")):
+        return src  # already absolute: nothing to join (the common case)
+    return join_url(base, src)
+
+@functools.lru_cache(maxsize=8192)
+def join_url(base: str, src: str) -> str:
+    # relative srcs repeat a lot within a page (icons, player embeds)
     return urljoin(base, src)
 
+def parse_html(html: str):
+    """lxml document (always has <html>/<body>); None for an empty page."""
+    try:
+        return etree.fromstring(html, HTML_PARSER)
+    except ValueError:
+        # str with an <?xml encoding=...?> declaration: lxml wants bytes
+        return etree.fromstring(html.encode("utf-8"), UTF8_HTML_PARSER)
+
+def node_text(el, sep: str = "") -> str:
+    """bs4 get_text(sep, strip=True): stripped text pieces joined by sep."""
+    return sep.join(t for t in (t.strip() for t in NODE_TEXT(el)) if t)
+
 def text_clean(html: str) -> str:
-    soup = BeautifulSoup(html or "", "html.parser")
-    # إزالة سكريبت/ستايل
-    for tag in soup(["script", "style", "noscript"]):
-        tag.extract()
-    return soup.get_text(separator=" ", strip=True)
+    root = parse_html(html or "")
+    if root is None:
+        return ""
+    # بدون سكريبت/ستايل
+    return " ".join(t for t in (t.strip() for t in PAGE_TEXT(root)) if t)
+
+def is_category_link(a) -> bool:
+    """Same match as 'nav a, .breadcrumb a, a[rel="category tag"]'."""
+    if " ".join((a.get("rel") or "").split()) == "category tag":
+        return True
+    for parent in a.iterancestors():
+        if parent.tag == "nav" or "breadcrumb" in (parent.get("class") or "").split():
+            return True
+    return False
+
+def is_article_container(el) -> bool:
+    return el.tag == "article" or not ARTICLE_CLASSES.isdisjoint((el.get("class") or "").split())
+
+def img_dim(value) -> int:
+    """width/height attribute -> px ("300", "300px"); 0 if missing or relative."""
+    m = DIM_RE.match(value or "")
+    return int(m.group(1)) if m else 0
+
+def is_icon(img, src: str) -> bool:
+    if src.startswith("data:"):
+        return True  # inline pixels/placeholders bloat the JSON
+    w, h = img_dim(img.get("width")), img_dim(img.get("height"))
+    if (w and w < MIN_IMAGE_SIDE) or (h and h < MIN_IMAGE_SIDE):
+        return True
+    return ICON_URL_RE.search(src) is not None
+
+def ld_nodes(data):
+    """Every JSON-LD object, in order (top level, lists and @graph)."""
+    if isinstance(data, list):
+        for item in data:
+            yield from ld_nodes(item)
+    elif isinstance(data, dict):
+        yield data
+        yield from ld_nodes(data.get("@graph"))
+
+def ld_str(value) -> str:
+    """author/name style values: "x", {"name": "x"} or a list of those -> first name."""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = value.get("name")
+    return value.strip() if isinstance(value, str) else ""
+
+def ld_urls(value) -> list:
+    """image values: "url", {"url": ...} or a list of those."""
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        return ld_urls(value.get("url"))
+    if isinstance(value, list):
+        return [u for v in value for u in ld_urls(v)]
+    return []
+
+def find_ld_article(html: str) -> dict:
+    """First Article-type JSON-LD object of the page ({} if none)."""
+    for m in LD_JSON_RE.finditer(html or ""):
+        try:
+            data = load_json(m.group(1).strip())
+        except Exception:
+            continue
+        for node in ld_nodes(data):
+            types = node.get("@type")
+            types = types if isinstance(types, list) else [types]
+            if not LD_ARTICLE_TYPES.isdisjoint(t for t in types if isinstance(t, str)):
+                return node
+    return {}
 
 def extract_from_article_html(url: str, html: str) -> dict:
-    soup = BeautifulSoup(html, "html.parser")
+    """
+    JSON-LD first (one small JSON blob), then one walk over the lxml tree
+    for categories/videos and whatever the JSON-LD did not provide.
+    """
+    ld = find_ld_article(html)
+    ld_body = ld_str(ld.get("articleBody"))
+    root = parse_html(html)
+
+    h1 = title_tag = None
+    categories = {}
+    metas = {}  # name/property -> content (أول ظهور)
+    time_tag = None
+    images = {}  # dict: insertion order + O(1) dedup
+    iframes = {}
+    video_srcs = {}
+    containers = {}  # container -> its paragraphs, in document order
+    all_paragraphs = []
+
+    for el in (root.iter() if root is not None else ()):
+        tag = el.tag
+        if not isinstance(tag, str):
+            continue  # comments / processing instructions
+
+        if tag == "h1":
+            if h1 is None:
+                h1 = el
+        elif tag == "title":
+            if title_tag is None:
+                title_tag = el
+        elif tag == "a":
+            # بعض الصفحات تضعها كرابط ضمن رأس الصفحة أو “breadcrumbs”
+            if is_category_link(el):
+                t = node_text(el)
+                if t and len(t) < 60:
+                    categories[t] = None
+        elif tag == "meta":
+            key = el.get("name") or el.get("property")
+            if key and key not in metas:
+                metas[key] = (el.get("content") or "").strip()
+        elif tag == "time":
+            if time_tag is None:
+                time_tag = el
+        elif tag == "img":
+            src = el.get("src") or el.get("data-src") or ""
+            if src and not is_icon(el, src):
+                absu = abs_url(url, src)
+                if absu:
+                    images[absu] = None
+        elif tag == "iframe":
+            # YouTube iframes / storyblok / jwplayer إلخ
+            src = el.get("src", "")
+            if src:
+                iframes[abs_url(url, src)] = None
+        elif tag == "video" or (tag == "source" and next(el.iterancestors("video"), None) is not None):
+            src = el.get("src", "")
+            if src:
+                video_srcs[abs_url(url, src)] = None
+        elif tag in PARAGRAPH_TAGS and not ld_body:
+            txt = node_text(el, " ")
+            if txt and len(txt) > 1:
+                all_paragraphs.append(txt)
+                for anc in el.iterancestors():
+                    if anc in containers:
+                        containers[anc].append(txt)
+
+        if is_article_container(el):
+            containers[el] = []
 
     # ---- Title ----
-    title_tag = soup.find("h1") or soup.find("title")
-    title = (title_tag.get_text(strip=True) if title_tag else "").strip()
-
-    # ---- Categories (بدائية) ----
-    categories = []
-    # بعض الصفحات تضعها كرابط ضمن رأس الصفحة أو “breadcrumbs”
-    for crumb in soup.select('nav a, .breadcrumb a, a[rel="category tag"]'):
-        t = crumb.get_text(strip=True)
-        if t and len(t) < 60:
-            categories.append(t)
-    categories = list(dict.fromkeys(categories))  # unique
+    title = ld_str(ld.get("headline"))
+    if not title:
+        title_el = h1 if h1 is not None else title_tag
+        title = node_text(title_el).strip() if title_el is not None else ""
 
     # ---- Author / Published (أفضل محاولة) ----
-    author = ""
-    published = ""
-    # محاولات عامة:
-    meta_author = soup.find("meta", attrs={"name": "author"}) or soup.find("meta", attrs={"property": "article:author"})
-    if meta_author:
-        author = meta_author.get("content", "").strip()
-
-    meta_pub = soup.find("meta", attrs={"property": "article:published_time"}) or soup.find("time")
-    if meta_pub:
-        published = (meta_pub.get("content") or meta_pub.get_text(strip=True) or "").strip()
-
-    # ---- Images ----
-    images = []
-    for img in soup.find_all("img"):
-        src = img.get("src") or img.get("data-src") or ""
-        if not src:
-            continue
-        # تجاهل الأيقونات الصغيرة
-        absu = abs_url(url, src)
-        if absu and absu not in images:
-            images.append(absu)
-
-    # ---- Videos (iframe, video, source) ----
-    videos = []
-    # YouTube iframes / storyblok / jwplayer إلخ
-    for ifr in soup.find_all("iframe"):
-        src = ifr.get("src", "")
-        if src:
-            videos.append(abs_url(url, src))
-    for v in soup.find_all("video"):
-        src = v.get("src", "")
-        if src:
-            videos.append(abs_url(url, src))
-        for s in v.find_all("source"):
-            ssrc = s.get("src", "")
-            if ssrc:
-                videos.append(abs_url(url, ssrc))
-    videos = list(dict.fromkeys(videos))
+    author = ld_str(ld.get("author"))
+    if not author:
+        author = metas.get("author") or metas.get("article:author", "")
+    published = (ld_str(ld.get("datePublished")) or metas.get("article:published_time")
+                 or metas.get("og:updated_time", ""))
+    if not published and time_tag is not None:
+        published = (time_tag.get("content") or node_text(time_tag) or "").strip()
+
+    # ---- Images: JSON-LD أولاً ثم صور الصفحة ----
+    ld_images = {}
+    for u in ld_urls(ld.get("image")):
+        absu = abs_url(url, u.strip())
+        if absu:
+            ld_images[absu] = None
+    ld_images.update(images)
+    images = ld_images
+
+    # ---- Videos (iframe أولاً ثم video/source) ----
+    videos = dict(iframes)
+    videos.update(video_srcs)
 
     # ---- Main text (جلب النص من جسد المقال) ----
-    # نحاول إيجاد حاويات شائعة للمقال
-    candidates = soup.select("article, .content, .post-content, .c-article, .story, .article-body")
-    if not candidates:
-        candidates = [soup.body or soup]
-
-    # اجمع فقرات نصية
-    paragraphs = []
-    for cand in candidates:
-        for p in cand.find_all(["p", "h2", "h3", "li"]):
-            txt = p.get_text(" ", strip=True)
-            if txt and len(txt) > 1:
-                paragraphs.append(txt)
-        if paragraphs:
-            break
-    description_text = "\n\n".join(paragraphs) if paragraphs else text_clean(html)
+    # أول حاوية مقال فيها فقرات، وإلا كل فقرات الصفحة
+    if ld_body:
+        description_text = ld_body
+    else:
+        paragraphs = next((paras for paras in containers.values() if paras), None)
+        if paragraphs is None and not containers:
+            paragraphs = all_paragraphs
+        description_text = "\n\n".join(paragraphs) if paragraphs else text_clean(html)
 
     # ---- Assemble ----
-    data = {
+    # (no module state read here: also runs in extract_pool worker processes)
+    return {
         "url": url,
         "title": title,
-        "categories": categories,
+        "categories": list(categories),
         "author": author,
         "published": published,
         "description_text": description_text,  # النص الكامل الحقيقي من الصفحة
-        "images": images,
-        "videos": videos
+        "images": list(images),
+        "videos": list(videos)
     }
-    if SAVE_HTML_IN_JSON:
-        data["html"] = html
-    return data
 
 # ========= Fetch modes =========
-def fetch_with_requests(url: str, cookies: dict | None = None, headers: dict | None = None) -> str | None:
-    h = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120 Safari/537.36",
-        "Accept-Language": "ar-SA,ar;q=0.9,en;q=0.8",
-    }
-    if headers:
-        h.update(headers)
+def fetch_with_requests(url: str, cookies: dict | None = None,
+                        headers: dict | None = None) -> tuple[int, dict, bytes] | None:
+    """(status, headers, body bytes) of any HTTP answer; None on network errors."""
+    # User-Agent / Accept-Language come from HTTP_SESSION; headers adds or overrides
     try:
-        r = requests.get(url, headers=h, cookies=cookies, timeout=TIMEOUT)
-        r.raise_for_status()
-        return r.text
+        r = HTTP_SESSION.get(url, headers=headers, cookies=cookies, timeout=TIMEOUT)
+        return r.status_code, r.headers, r.content
     except Exception as e:
         print(f"[requests] fetch failed: {e}")
         return None
 
-def fetch_with_playwright(url: str, do_login: bool = False) -> str | None:
-    if not PLAYWRIGHT_AVAILABLE:
-        print("[playwright] not available, falling back to requests.")
-        return None
+def decode_body(headers: dict, body: bytes) -> str:
+    # r.text would run charset detection over the whole body when the
+    # server sends no charset; decode the (already decompressed) bytes once
+    encoding = requests.utils.get_encoding_from_headers(headers) or "utf-8"
+    try:
+        return body.decode(encoding, errors="replace")
+    except LookupError:  # unknown charset label (utf8mb4, "utf-8,gzip" ...)
+        return body.decode("utf-8", errors="replace")
+
+def is_js_wall(body: bytes) -> bool:
+    """JS gate / access denied page? Only the head is scanned, nothing is copied."""
+    return JS_WALL_RE.search(body, 0, JS_WALL_SCAN) is not None
+
+def block_heavy(route):
+    if route.request.resource_type in BLOCKED_RESOURCES:
+        route.abort()
+    else:
+        route.continue_()
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
-        page = context.new_page()
+class PlaywrightPool:
+    """
+    One Chromium + context for the whole run: each fetch only opens (and
+    closes) a page, instead of a browser cold start per URL. After a login
+    the context's cookies are saved to CR_STORAGE_STATE and reused by the
+    next run, so credentials are not re-entered every time.
+    """
 
+    def __init__(self, do_login: bool = False):
+        self.do_login = do_login
+        self.logged_in = False
+
+    def __enter__(self):
+        self.pw = sync_playwright().start()
+        self.browser = self.pw.chromium.launch(headless=True)
+        state = CR_STORAGE_STATE if self.do_login and Path(CR_STORAGE_STATE).exists() else None
+        self.context = self.browser.new_context(storage_state=state)
+        self.context.route("**/*", block_heavy)  # every page of the context
+        self.logged_in = state is not None
+        return self
+
+    def __exit__(self, *exc):
+        self.context.close()
+        self.browser.close()
+        self.pw.stop()
+
+    def login(self):
+        if self.logged_in or not (CR_EMAIL and CR_PASSWORD):
+            return
+        page = self.context.new_page()
         try:
-            if do_login and CR_EMAIL and CR_PASSWORD:
-                # محاولة تسجيل الدخول (المسارات تتغير أحياناً—هذه محاولة عامة)
-                page.goto("https://www.crunchyroll.com/login", timeout=60000)
-                page.wait_for_load_state("domcontentloaded")
-                # الحقول الشائعة:
-                # قد تحتاج لتعديل السيلكتورز لو تغيرت الصفحة
-                page.fill('input[name="email"]', CR_EMAIL)
-                page.fill('input[name="password"]', CR_PASSWORD)
-                page.click('button[type="submit"]')
-                page.wait_for_load_state("networkidle", timeout=60000)
-
-            page.goto(url, timeout=60000)
+            # محاولة تسجيل الدخول (المسارات تتغير أحياناً—هذه محاولة عامة)
+            page.goto("https://www.crunchyroll.com/login", timeout=60000)
+            page.wait_for_load_state("domcontentloaded")
+            # الحقول الشائعة:
+            # قد تحتاج لتعديل السيلكتورز لو تغيرت الصفحة
+            page.fill('input[name="email"]', CR_EMAIL)
+            page.fill('input[name="password"]', CR_PASSWORD)
+            page.click('button[type="submit"]')
             page.wait_for_load_state("networkidle", timeout=60000)
-            html = page.content()
-            return html
+        finally:
+            page.close()
+        self.context.storage_state(path=CR_STORAGE_STATE)
+        self.logged_in = True
+
+    def fetch(self, url: str) -> str | None:
+        page = None
+        try:
+            if self.do_login:
+                self.login()
+            page = self.context.new_page()
+            # the article DOM is server-rendered; no need to wait for network idle
+            page.goto(url, timeout=60000, wait_until="domcontentloaded")
+            return page.content()
         except Exception as e:
             print(f"[playwright] fetch failed: {e}")
             return None
         finally:
-            context.close()
-            browser.close()
+            if page is not None:
+                page.close()
+
+def fetch_with_playwright(url: str, do_login: bool = False) -> str | None:
+    if not PLAYWRIGHT_AVAILABLE:
+        print("[playwright] not available, falling back to requests.")
+        return None
+
+    with PlaywrightPool(do_login=do_login) as pool:
+        return pool.fetch(url)
 
 # ========= Save JSON =========
+def dump_json(data) -> bytes:
+    """UTF-8 JSON, 2-space indent."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+def load_json(raw: bytes):
+    return orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """
+    Write to a per-process temp file next to path, fsync, then os.replace
+    (atomic on POSIX): concurrent runs never see or leave a torn file.
+    """
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)  # never leave an orphan for git add -A
+        raise
+
+def saved_url(path: Path) -> str | None:
+    """url field of an already saved article (None if unreadable)."""
+    try:
+        return load_json(path.read_bytes()).get("url")
+    except (OSError, ValueError, AttributeError):
+        return None
+
 def save_json(data: dict):
     out_dir = today_paths()
-    slug = slugify(data.get("title") or urlparse(data.get("url") or "").path.split("/")[-1])
+    url = data.get("url") or ""
+    slug = slugify(data.get("title") or urlparse(url).path.split("/")[-1])
     out_path = out_dir / f"{slug}.json"
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    # نفس العنوان لمقال آخر: لا نكتب فوقه، نضيف بصمة قصيرة من الرابط
+    if out_path.exists() and saved_url(out_path) != url:
+        out_path = out_dir / f"{slug}-{hashlib.blake2b(url.encode(), digest_size=4).hexdigest()}.json"
+    atomic_write_bytes(out_path, dump_json(data))
     print(f"[saved] {out_path.as_posix()}")
 
 # ========= Optional merge into daily file =========
@@ -216,8 +504,7 @@ def merge_into_daily_file(scraped: dict):
     if not daily_file.exists():
         return
     try:
-        with open(daily_file, "r", encoding="utf-8") as f:
-            arr = json.load(f)
+        arr = load_json(daily_file.read_bytes())
         changed = False
         for item in arr:
             if (item.get("title") or "").strip() == (scraped.get("title") or "").strip():
@@ -228,26 +515,76 @@ def merge_into_daily_file(scraped: dict):
                 changed = True
                 break
         if changed:
-            with open(daily_file, "w", encoding="utf-8") as f:
-                json.dump(arr, f, ensure_ascii=False, indent=2)
+            atomic_write_bytes(daily_file, dump_json(arr))
             print(f"[merged] into daily file: {daily_file.as_posix()}")
     except Exception as e:
         print(f"[merge] failed: {e}")
 
 # ========= Main =========
+def fetch_static(url: str) -> tuple[str | None, bool]:
+    """
+    Requests fetch -> (html, use_browser).
+    html is None when it failed; use_browser says whether Playwright is worth
+    a try (network error, 403/429/503, JS wall) or not (e.g. 404).
+    """
+    res = fetch_with_requests(url)
+    if res is None:
+        return None, True
+    status, headers, body = res
+    if status in BROWSER_STATUS or is_js_wall(body):
+        return None, True
+    if status >= 400:
+        print(f"[requests] HTTP {status}: {url}")
+        return None, False
+    return decode_body(headers, body), False
+
+def save_scraped(data: dict, html: str):
+    if SAVE_HTML_IN_JSON:
+        data["html"] = html
+    save_json(data)
+
+    # (اختياري) دمج داخل ملف اليوم:
+    # merge_into_daily_file(data)
+
+def raw_record(url: str, html: str) -> dict:
+    """--raw: the page as-is, titled from <title> for the slug; nothing is parsed."""
+    m = TITLE_RE.search(html)
+    title = " ".join(unescape(m.group(1)).split()) if m else ""
+    return {"url": url, "title": title, "html": html}
+
+def extract_and_save(url: str, html: str):
+    if RAW_MODE:
+        save_json(raw_record(url, html))
+    else:
+        save_scraped(extract_from_article_html(url, html), html)
+
+def extract_pool(n_pages: int):
+    """
+    Executor for extract_from_article_html in batch mode, None = parse inline.
+    lxml tree building + text joins are CPU work that one interpreter runs
+    serially under the GIL, so large batches get worker processes (threads
+    on a free-threaded build).
+    """
+    workers = min(os.cpu_count() or 1, n_pages)
+    if n_pages < EXTRACT_POOL_MIN or workers < 2:
+        return None
+    gil_enabled = sys._is_gil_enabled() if hasattr(sys, "_is_gil_enabled") else True
+    if not gil_enabled:
+        return ThreadPoolExecutor(max_workers=workers)
+    # spawn, not fork: the fetch threads are already running at this point
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
 def scrape_one(url: str, force_playwright: bool = False, try_login: bool = False):
-    html = None
+    html, use_browser = None, True
 
     # 1) Requests first (سريع) إن لم نفرض Playwright
     if not force_playwright:
-        html = fetch_with_requests(url)
-        if html and "Please enable JavaScript" not in html and "access denied" not in html.lower():
+        html, use_browser = fetch_static(url)
+        if html:
             print("[mode] requests")
-        else:
-            html = None
 
     # 2) Playwright fallback
-    if html is None and (USE_PLAYWRIGHT_DEFAULT or force_playwright):
+    if html is None and use_browser and (USE_PLAYWRIGHT_DEFAULT or force_playwright):
         html = fetch_with_playwright(url, do_login=try_login)
         if html:
             print("[mode] playwright")
@@ -256,26 +593,84 @@ def scrape_one(url: str, force_playwright: bool = False, try_login: bool = False
         print("[error] unable to fetch page by requests or playwright.")
         return
 
-    data = extract_from_article_html(url, html)
-    save_json(data)
+    extract_and_save(url, html)
 
-    # (اختياري) دمج داخل ملف اليوم:
-    # merge_into_daily_file(data)
+def scrape_many(urls: list, force_playwright: bool = False, try_login: bool = False,
+                workers: int = MAX_WORKERS):
+    """
+    Batch mode: the requests fetches (pure network wait) run concurrently in
+    a thread pool, so wall time is ~the slowest page instead of the sum.
+    Pages that need the browser are fetched afterwards, one at a time.
+    """
+    urls = list(dict.fromkeys(u.strip() for u in urls if u.strip()))
+    need_browser = list(urls) if force_playwright else []
+
+    if not force_playwright:
+        cpu_pool = None if RAW_MODE else extract_pool(len(urls))
+        jobs = []
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(urls) or 1))) as pool:
+                # results arrive in input order; extraction goes to cpu_pool when there is one
+                for url, (html, use_browser) in zip(urls, pool.map(fetch_static, urls)):
+                    if html:
+                        print(f"[mode] requests: {url}")
+                        if cpu_pool is None:
+                            extract_and_save(url, html)
+                        else:
+                            jobs.append((html, cpu_pool.submit(extract_from_article_html, url, html)))
+                    elif use_browser:
+                        need_browser.append(url)
+                    else:
+                        print(f"[error] unable to fetch page: {url}")
+            for html, job in jobs:
+                save_scraped(job.result(), html)
+        finally:
+            if cpu_pool is not None:
+                cpu_pool.shutdown()
+
+    if not need_browser:
+        return
+    if not PLAYWRIGHT_AVAILABLE or not (USE_PLAYWRIGHT_DEFAULT or force_playwright):
+        if not PLAYWRIGHT_AVAILABLE:
+            print("[playwright] not available, falling back to requests.")
+        for url in need_browser:
+            print(f"[error] unable to fetch page by requests or playwright: {url}")
+        return
+
+    # one browser for every remaining URL
+    with PlaywrightPool(do_login=try_login) as pool:
+        for url in need_browser:
+            html = pool.fetch(url)
+            if html:
+                print(f"[mode] playwright: {url}")
+                extract_and_save(url, html)
+            else:
+                print(f"[error] unable to fetch page by requests or playwright: {url}")
 
 
 def main():
     parser = argparse.ArgumentParser(description="Scrape Crunchyroll news article (full text, images, videos) to JSON.")
-    parser.add_argument("--url", required=True, help="Article URL")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--url", help="Article URL")
+    src.add_argument("--urls-file", help="Text file with one article URL per line (scraped concurrently)")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="Concurrent fetches for --urls-file")
     parser.add_argument("--force-browser", action="store_true", help="Force using Playwright browser")
     parser.add_argument("--login", action="store_true", help="Try login (requires CR_EMAIL & CR_PASSWORD env)")
     parser.add_argument("--save-html", action="store_true", help="Include raw HTML in JSON")
+    parser.add_argument("--raw", action="store_true", help="Skip extraction: save only url, <title> and raw HTML")
     args = parser.parse_args()
 
-    global SAVE_HTML_IN_JSON
+    global SAVE_HTML_IN_JSON, RAW_MODE
     if args.save_html:
         SAVE_HTML_IN_JSON = True
-
-    scrape_one(args.url, force_playwright=args.force_browser, try_login=args.login)
+    if args.raw:
+        RAW_MODE = True
+
+    if args.urls_file:
+        urls = Path(args.urls_file).read_text(encoding="utf-8").splitlines()
+        scrape_many(urls, force_playwright=args.force_browser, try_login=args.login, workers=args.workers)
+    else:
+        scrape_one(args.url, force_playwright=args.force_browser, try_login=args.login)
 
 if __name__ == "__main__":
     main()
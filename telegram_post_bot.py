@@ -1,8 +1,8 @@
 import os
-import json
 import asyncio
 import logging
 import hashlib
+import functools
 from pathlib import Path
 from datetime import datetime
 from zoneinfo import ZoneInfo
@@ -10,16 +10,21 @@ from io import BytesIO
 from urllib.parse import quote
 import re
 
+import orjson
+
 # Telegram
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
     Application, CommandHandler, MessageHandler, 
     CallbackQueryHandler, ConversationHandler, filters, ContextTypes
 )
+from telegram.error import RetryAfter
 
 # Pillow + HTTP
 from PIL import Image, ImageOps
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # ====================
 # CONFIG
@@ -63,6 +68,13 @@ JPEG_QUALITY = 85
 WEBP_QUALITY = 85
 HTTP_TIMEOUT = 25
 
+# JSON output: same compact format as bot.py (both bots write global_index/)
+PRETTY_JSON = False
+
+# Telegram flood control (429 RetryAfter) on the main-channel post
+TG_SEND_TRIES = 3
+TG_RETRY_MAX_DELAY = 60
+
 # Conversation states
 (
     WAITING_TITLE,
@@ -84,9 +96,23 @@ CATEGORIES = [
     "أخرى"
 ]
 
+# slugify patterns (compiled once, used per article)
+SLUG_WS_RE   = re.compile(r"\s+")
+SLUG_BAD_RE  = re.compile(r"[^a-z0-9\u0600-\u06FF\-]+")  # keep arabic + latin + numbers + dash
+SLUG_DASH_RE = re.compile(r"-{2,}")
+
 # Logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# Shared HTTP session (keep-alive + pooled connections to the image CDNs)
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.headers["User-Agent"] = "anime-news-bot/1.0"
+HTTP_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
 
 # ====================
 # Utility Functions
@@ -110,37 +136,99 @@ def load_json_list(path: Path) -> list:
     if not path.exists():
         return []
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
             return data if isinstance(data, list) else []
     except Exception as e:
         logging.error(f"Failed reading {path}: {e}")
         return []
 
+def dump_json(data) -> bytes:
+    opts = orjson.OPT_NON_STR_KEYS
+    if PRETTY_JSON:
+        opts |= orjson.OPT_INDENT_2
+    return orjson.dumps(data, option=opts)
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """Write to a temp file next to path, then os.replace (atomic on POSIX)."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+def save_json(path: Path, data):
+    """orjson straight to bytes (UTF-8) - no intermediate str."""
+    payload = dump_json(data)
+    if path.exists() and path.stat().st_size == len(payload) and path.read_bytes() == payload:
+        return  # unchanged: no write, no mtime bump
+    atomic_write_bytes(path, payload)
+
 def save_json_list(path: Path, data: list):
     try:
         ensure_dir(path.parent)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        save_json(path, data)
     except Exception as e:
         logging.error(f"Failed writing {path}: {e}")
 
+def append_json_list(path: Path, records: list):
+    """
+    Append records to a JSON array file in place: the closing "]" is
+    overwritten with ",<records>]" so existing items are not re-parsed.
+    Falls back to load + extend + save when the file does not end in "]".
+    """
+    if not records:
+        return
+    if not path.exists() or path.stat().st_size == 0:
+        save_json_list(path, records)
+        return
+    try:
+        inner = dump_json(records)[1:-1].rstrip()  # drop the outer [ ]
+        with open(path, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            tail_start = max(0, size - 64)
+            f.seek(tail_start)
+            tail = f.read().rstrip()
+            if tail.endswith(b"]"):
+                body = tail[:-1].rstrip()
+                is_empty = body.endswith(b"[")
+                f.seek(tail_start + len(body))
+                f.write((b"" if is_empty else b",") + inner + (b"\n]" if PRETTY_JSON else b"]"))
+                f.truncate()
+                return
+    except Exception as e:
+        logging.error(f"In-place append failed for {path}: {e}")
+
+    try:
+        items = orjson.loads(path.read_bytes())
+    except Exception as e:
+        logging.error(f"Not appending to unreadable {path}: {e}")
+        return
+    if not isinstance(items, list):
+        logging.error(f"Not appending to {path}: not a JSON list")
+        return
+    items.extend(records)
+    save_json_list(path, items)
+
 def slugify(text: str, max_len: int = 60) -> str:
     text = (text or "").strip().lower()
-    text = re.sub(r"\s+", "-", text)
-    text = re.sub(r"[^a-z0-9\u0600-\u06FF\-]+", "", text)
-    text = re.sub(r"-{2,}", "-", text).strip("-")
+    text = SLUG_WS_RE.sub("-", text)
+    text = SLUG_BAD_RE.sub("", text)
+    text = SLUG_DASH_RE.sub("-", text).strip("-")
     return text[:max_len] if text else "image"
 
-def stable_article_id(title: str, image_url: str) -> str:
-    """Stable ID based on title + image url."""
-    key = f"{(title or '').strip()}|{(image_url or '').strip()}"
-    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+def stable_article_id(title: str, image_url: str, legacy: bool = False) -> str:
+    """
+    Stable ID based on title + image url (12 hex chars of blake2b).
+    legacy=True gives the sha1[:12] id used before the switch.
+    """
+    key = f"{(title or '').strip()}|{(image_url or '').strip()}".encode("utf-8")
+    if legacy:
+        return hashlib.sha1(key).hexdigest()[:12]
+    return hashlib.blake2b(key, digest_size=6).hexdigest()
 
-def stable_image_filename(title: str, image_url: str) -> str:
+def stable_image_filename(title: str, image_url: str, legacy: bool = False) -> str:
     """Stable filename based on hash(title + image_url)."""
     base = slugify(title)
-    h = stable_article_id(title, image_url)
+    h = stable_article_id(title, image_url, legacy=legacy)
     return f"{base}-{h}.webp"
 
 def build_raw_github_url(rel_path: str) -> str:
@@ -158,49 +246,67 @@ def build_article_url(day_path: str, idx: int) -> str:
 def fetch_image(url: str) -> Image.Image | None:
     """Fetch image from URL"""
     try:
-        r = requests.get(url, timeout=HTTP_TIMEOUT)
+        r = HTTP_SESSION.get(url, timeout=HTTP_TIMEOUT)
         r.raise_for_status()
         im = Image.open(BytesIO(r.content))
-        im = ImageOps.exif_transpose(im)
-        return im.convert("RGBA")
+        if im.format == "JPEG":
+            # shrink-on-load: libjpeg decodes at 1/2, 1/4 or 1/8 scale
+            # while staying >= the box downscale_to_fit will cap it to
+            im.draft("RGB", (MAX_IMAGE_WIDTH, MAX_IMAGE_HEIGHT))
+        im.load()
+        # 274 = EXIF Orientation; web images are nearly always 1 (or untagged)
+        if im.getexif().get(274, 1) != 1:
+            im = ImageOps.exif_transpose(im)  # fix orientation
+        # RGB is enough: overlay_logo pastes with the logo's own alpha as mask
+        return im.convert("RGB")
     except Exception as e:
         logging.error(f"fetch_image failed for {url}: {e}")
         return None
 
 def downscale_to_fit(im: Image.Image) -> Image.Image:
     """Resize image to fit within limits"""
-    w, h = im.size
-    scale = min(
-        (MAX_IMAGE_WIDTH / w) if w > 0 else 1,
-        (MAX_IMAGE_HEIGHT / h) if h > 0 else 1,
-        1
-    )
-    if scale < 1:
-        new_w = max(1, int(w * scale))
-        new_h = max(1, int(h * scale))
-        im = im.resize((new_w, new_h), Image.LANCZOS)
+    # in place, keeps aspect ratio, never upscales; box pre-reduce to
+    # ~3x the target before the Lanczos pass
+    im.thumbnail((MAX_IMAGE_WIDTH, MAX_IMAGE_HEIGHT), Image.LANCZOS, reducing_gap=3.0)
     return im
 
-def overlay_logo(im: Image.Image) -> Image.Image:
-    """Add logo overlay to image"""
+def load_logo() -> Image.Image | None:
     if not Path(LOGO_PATH).exists():
         logging.warning(f"Logo file not found: {LOGO_PATH}")
+        return None
+    try:
+        return Image.open(LOGO_PATH).convert("RGBA")
+    except Exception as e:
+        logging.error(f"Failed to open logo: {e}")
+        return None
+
+# Decoded once per process; resized variants are cached by width below
+LOGO_SRC = load_logo()
+
+@functools.lru_cache(maxsize=8)
+def logo_for_width(lw: int) -> tuple[Image.Image, Image.Image]:
+    """Logo resized to width lw, plus its alpha band (used as paste mask)."""
+    ratio = lw / LOGO_SRC.width
+    lh = int(max(1, LOGO_SRC.height * ratio))
+    logo_resized = LOGO_SRC.resize((lw, lh), Image.LANCZOS)
+    return logo_resized, logo_resized.split()[-1]
+
+def overlay_logo(im: Image.Image) -> Image.Image:
+    """Add logo overlay to image"""
+    if LOGO_SRC is None:
         return im
     
     try:
-        logo = Image.open(LOGO_PATH).convert("RGBA")
-        
         pw, ph = im.size
         lw_ratio = LOGO_MIN_WIDTH_RATIO if pw < 600 else LOGO_MAX_WIDTH_RATIO
         lw = int(max(1, min(pw - 2 * LOGO_MARGIN, pw * lw_ratio)))
-        ratio = lw / logo.width
-        lh = int(max(1, logo.height * ratio))
         
-        logo_resized = logo.resize((lw, lh), Image.LANCZOS)
+        # resized logo + alpha mask, cached per width
+        logo_resized, mask = logo_for_width(lw)
         
         x = pw - lw - LOGO_MARGIN
         y = LOGO_MARGIN
-        im.paste(logo_resized, (x, y), logo_resized)
+        im.paste(logo_resized, (x, y), mask)
         return im
         
     except Exception as e:
@@ -238,6 +344,17 @@ def process_image_with_logo(url: str, out_format: str = "WEBP") -> BytesIO | Non
         logging.error(f"Failed to save processed image: {e}")
         return None
 
+def target_webp_path(title: str, image_url: str, dt: datetime) -> Path:
+    """
+    images/YYYY/MM/<stable filename>.webp for this article image.
+    An image stored before the blake2b switch keeps its sha1 name.
+    """
+    month_dir = IMAGES_DIR / f"{dt.year}" / f"{dt.month:02d}"
+    legacy_path = month_dir / stable_image_filename(title, image_url, legacy=True)
+    if legacy_path.exists():
+        return legacy_path
+    return month_dir / stable_image_filename(title, image_url)
+
 def save_image_to_repo(title: str, image_url: str, dt: datetime) -> tuple[str, str, bool]:
     """
     Save processed image with logo to repository.
@@ -246,6 +363,15 @@ def save_image_to_repo(title: str, image_url: str, dt: datetime) -> tuple[str, s
     if not image_url:
         return None, None, False
     
+    file_path = target_webp_path(title, image_url, dt)
+    rel_path = file_path.as_posix()
+    raw_url = build_raw_github_url(rel_path)
+    
+    # Already saved (content-addressed name): skip download + resize + encode
+    if file_path.exists():
+        logging.info(f"Image already exists: {rel_path}")
+        return rel_path, raw_url, False
+    
     # Process image with logo
     webp_bytes = process_image_with_logo(image_url, out_format="WEBP")
     if not webp_bytes:
@@ -253,21 +379,9 @@ def save_image_to_repo(title: str, image_url: str, dt: datetime) -> tuple[str, s
         return None, None, False
     
     # Save to repo
-    y, m = dt.year, dt.month
-    out_dir = IMAGES_DIR / f"{y}" / f"{m:02d}"
-    ensure_dir(out_dir)
-    
-    filename = stable_image_filename(title, image_url)
-    file_path = out_dir / filename
-    rel_path = file_path.as_posix()
-    raw_url = build_raw_github_url(rel_path)
+    ensure_dir(file_path.parent)
     
-    if file_path.exists():
-        logging.info(f"Image already exists: {rel_path}")
-        return rel_path, raw_url, False
-    
-    webp_bytes.seek(0)
-    file_path.write_bytes(webp_bytes.read())
+    atomic_write_bytes(file_path, webp_bytes.getvalue())
     logging.info(f"Saved new image: {rel_path}")
     return rel_path, raw_url, True
 
@@ -294,12 +408,21 @@ def save_article_to_daily(article_data: dict) -> tuple[str, int]:
     if isinstance(article_data.get("categories"), str):
         article_data["categories"] = [article_data["categories"]]
     
-    existing.append(article_data)
-    save_json_list(path, existing)
-    idx = len(existing) - 1
+    idx = len(existing)
+    append_json_list(path, [article_data])
     
     return str(path), idx
 
+def load_manifest(path: Path, key: str) -> dict | None:
+    """Existing manifest if it parses and has a dict under key, else None."""
+    try:
+        manifest = orjson.loads(path.read_bytes())
+    except Exception:
+        return None
+    if not isinstance(manifest, dict) or not isinstance(manifest.get(key), dict):
+        return None
+    return manifest
+
 def update_manifests(dt: datetime):
     """Update month and year manifests"""
     # Update month manifest
@@ -308,37 +431,60 @@ def update_manifests(dt: datetime):
     ensure_dir(month_dir)
     manifest_path = month_dir / "month_manifest.json"
     
-    days = {}
-    for p in sorted(month_dir.glob("*.json")):
-        if p.name == "month_manifest.json":
-            continue
-        day_key = p.stem
-        days[day_key.split("-")[0]] = str(p.as_posix())
+    # only today's entry can change: update it in the existing manifest
+    day_file = month_dir / f"{dt.day:02d}-{m:02d}.json"
+    manifest = load_manifest(manifest_path, "days")
+    if manifest is not None:
+        days = manifest["days"]
+        if day_file.exists():
+            days[f"{dt.day:02d}"] = day_file.as_posix()
+            days = dict(sorted(days.items(), reverse=True))
+    else:
+        # missing/corrupt manifest: rebuild from the directory, newest first
+        # scandir: DirEntry carries the file type, no stat() per file
+        with os.scandir(month_dir) as it:
+            names = sorted((e.name for e in it
+                            if e.is_file() and e.name.endswith(".json") and e.name != "month_manifest.json"),
+                           reverse=True)
+
+        month_prefix = month_dir.as_posix()  # once, not per file
+        days = {}
+        for name in names:
+            days.setdefault(name[:2], f"{month_prefix}/{name}")  # "DD-MM.json" -> "DD"
     
     manifest = {
         "year": str(y),
         "month": f"{m:02d}",
-        "days": dict(sorted(days.items(), key=lambda kv: kv[0], reverse=True))
+        "days": days
     }
-    with open(manifest_path, "w", encoding="utf-8") as f:
-        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    save_json(manifest_path, manifest)
     
     # Update year manifest
     year_dir = DATA_BASE / f"{y}"
     ensure_dir(year_dir)
     manifest_path = year_dir / "year_manifest.json"
     
-    months = {}
-    for p in sorted(year_dir.glob("[0-1][0-9]")):
-        m_name = p.name
-        months[m_name] = f"{(p / 'month_manifest.json').as_posix()}"
+    manifest = load_manifest(manifest_path, "months")
+    if manifest is not None:
+        months = manifest["months"]
+        if month_dir.is_dir():
+            months[f"{m:02d}"] = f"{(month_dir / 'month_manifest.json').as_posix()}"
+            months = dict(sorted(months.items(), reverse=True))
+    else:
+        # month dirs "01".."12" (same match as the old "[0-1][0-9]" glob), newest first
+        with os.scandir(year_dir) as it:
+            names = sorted((e.name for e in it
+                            if e.is_dir() and len(e.name) == 2 and e.name[0] in "01" and e.name[1].isdigit()),
+                           reverse=True)
+
+        year_prefix = year_dir.as_posix()
+        months = {m_name: f"{year_prefix}/{m_name}/month_manifest.json" for m_name in names}
     
     manifest = {
         "year": str(y),
-        "months": dict(sorted(months.items(), key=lambda kv: kv[0], reverse=True))
+        "months": months
     }
-    with open(manifest_path, "w", encoding="utf-8") as f:
-        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    save_json(manifest_path, manifest)
 
 def add_to_global_index(article: dict, day_path_str: str, idx: int):
     """Add article to global index files"""
@@ -349,18 +495,22 @@ def add_to_global_index(article: dict, day_path_str: str, idx: int):
     if not pag_path.exists():
         pagination = {"total_articles": 0, "files": []}
     else:
-        with open(pag_path, "r", encoding="utf-8") as f:
-            pagination = json.load(f)
+        with open(pag_path, "rb") as f:
+            pagination = orjson.loads(f.read())
     
     # Get current index file
     if not pagination["files"]:
-        first = GLOBAL_INDEX / "index_1.json"
-        save_json_list(first, [])
         pagination["files"].append("index_1.json")
+        pagination["current_len"] = 0
     
     current_filename = pagination["files"][-1]
     current_file = GLOBAL_INDEX / current_filename
-    items = load_json_list(current_file)
+    
+    # size of the last page is kept in pagination.json (shared with bot.py);
+    # the page is only read for files written before "current_len" existed
+    current_len = pagination.get("current_len")
+    if current_len is None:
+        current_len = len(load_json_list(current_file))
     
     # Create slim record (same format as your existing bot)
     slim_record = {
@@ -374,27 +524,22 @@ def add_to_global_index(article: dict, day_path_str: str, idx: int):
     }
     
     # Rotate if needed
-    if len(items) >= GLOBAL_PAGE_SIZE:
+    if current_len >= GLOBAL_PAGE_SIZE:
         next_idx = len(pagination["files"]) + 1
         current_filename = f"index_{next_idx}.json"
         current_file = GLOBAL_INDEX / current_filename
-        save_json_list(current_file, [])
         pagination["files"].append(current_filename)
-        items = []
-    
-    items.append(slim_record)
-    save_json_list(current_file, items)
+        current_len = 0
     
-    # Update total count
-    total_articles = 0
-    for file in pagination["files"]:
-        file_path = GLOBAL_INDEX / file
-        total_articles += len(load_json_list(file_path))
+    # append in place: the page is neither parsed nor re-serialized
+    append_json_list(current_file, [slim_record])
+    pagination["current_len"] = current_len + 1
     
+    # Update total count (tracked, not recounted across every page)
+    total_articles = (pagination.get("total_articles") or 0) + 1
     pagination["total_articles"] = total_articles
     
-    with open(pag_path, "w", encoding="utf-8") as f:
-        json.dump(pagination, f, ensure_ascii=False, indent=2)
+    save_json(pag_path, pagination)
     
     # Update stats
     stats_path = GLOBAL_INDEX / "stats.json"
@@ -402,8 +547,20 @@ def add_to_global_index(article: dict, day_path_str: str, idx: int):
         "total_articles": total_articles,
         "last_update": iso_now()
     }
-    with open(stats_path, "w", encoding="utf-8") as f:
-        json.dump(stats, f, ensure_ascii=False, indent=2)
+    save_json(stats_path, stats)
+
+
+async def send_with_retry(send, **kwargs):
+    """await send(**kwargs); on 429 RetryAfter wait (capped back-off) and retry, TG_SEND_TRIES attempts."""
+    for attempt in range(1, TG_SEND_TRIES + 1):
+        try:
+            return await send(**kwargs)
+        except RetryAfter as e:
+            if attempt == TG_SEND_TRIES:
+                raise
+            delay = min(max(float(e.retry_after), 2 ** (attempt - 1)), TG_RETRY_MAX_DELAY)
+            logging.warning(f"Telegram flood control, retry {attempt}/{TG_SEND_TRIES - 1} in {delay:.0f}s")
+            await asyncio.sleep(delay)
 
 
 # ====================
@@ -539,7 +696,7 @@ async def receive_image_url(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     # Test if URL is accessible
     try:
-        response = requests.head(image_url, timeout=10)
+        response = await asyncio.to_thread(HTTP_SESSION.head, image_url, timeout=10)
         if response.status_code != 200:
             await update.message.reply_text(
                 "⚠️ تحذير: الرابط قد لا يكون صالحاً. هل تريد المتابعة؟\n"
@@ -650,17 +807,22 @@ async def confirm_article(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     # Process and save article
     try:
-        await query.edit_message_text("⏳ جاري حفظ المقال ومعالجة الصورة...")
-        
         # Prepare article data
         title = context.user_data.get('title')
         image_url = context.user_data.get('image_url')
         
-        # Process image with logo and save to repo
+        progress = query.edit_message_text("⏳ جاري حفظ المقال ومعالجة الصورة...")
+        
+        # Process image with logo and save to repo: download + encode run in a
+        # worker thread, overlapping the progress edit and keeping the bot
+        # responsive to other updates meanwhile
         processed_image_url = None
         if image_url:
             today = now_local()
-            rel_path, raw_url, created = save_image_to_repo(title, image_url, today)
+            _, (rel_path, raw_url, created) = await asyncio.gather(
+                progress,
+                asyncio.to_thread(save_image_to_repo, title, image_url, today),
+            )
             if raw_url:
                 processed_image_url = raw_url
                 logging.info(f"Image saved to: {rel_path}")
@@ -668,6 +830,8 @@ async def confirm_article(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 # Use original URL if processing failed
                 processed_image_url = image_url
                 logging.warning(f"Using original image URL: {image_url}")
+        else:
+            await progress
         
         # Create article record
         article_data = {
@@ -713,14 +877,16 @@ async def confirm_article(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 
                 # Send to main channel with processed image if available
                 if processed_image_url:
-                    await main_bot.bot.send_photo(
+                    await send_with_retry(
+                        main_bot.bot.send_photo,
                         chat_id=TELEGRAM_CHAT_ID,
                         photo=processed_image_url,
                         caption=f"📢 *مقال جديد*\n\n{title}\n\n{article_url}",
                         parse_mode='Markdown'
                     )
                 else:
-                    await main_bot.bot.send_message(
+                    await send_with_retry(
+                        main_bot.bot.send_message,
                         chat_id=TELEGRAM_CHAT_ID,
                         text=f"📢 *مقال جديد*\n\n{title}\n\n{article_url}",
                         parse_mode='Markdown',